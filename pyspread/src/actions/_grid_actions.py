@@ -46,9 +46,14 @@ Provides:
 """
 
 import bz2
+import cPickle
 import itertools
 import src.lib.i18n as i18n
+from multiprocessing.pool import ThreadPool
 import os
+import threading
+
+import numpy
 
 import wx
 
@@ -240,6 +245,7 @@ class FileActions(Actions):
 
         # Clear attributes
         del self.code_array.dict_grid.cell_attributes[:]
+        self.code_array.dict_grid.cell_attributes.clear_caches()
 
         if shape is not None:
             # Set shape
@@ -357,9 +363,15 @@ class FileActions(Actions):
         infile.close()
         self.opening = False
 
+        # Attributes have been appended without clearing caches
+        self.code_array.cell_attributes.clear_caches()
+
         # Execute macros
         self.main_window.actions.execute_macros()
 
+        # Restore frozen results after macros have reset the frozen cache
+        self.load_frozen_results(filepath)
+
         # Enable undo again
         self.grid.code_array.unredo.active = False
 
@@ -369,6 +381,135 @@ class FileActions(Actions):
         # File sucessfully opened. Approve again to show status.
         self.approve(filepath)
 
+    def _get_frozen_filepath(self, filepath):
+        """Returns file path of the frozen results file for filepath"""
+
+        return filepath + ".frozen"
+
+    def load_frozen_results(self, filepath):
+        """Restores frozen cell results from frozen results file
+
+        The frozen results file is a pickle file. Since unpickling may
+        execute arbitrary code, results are only loaded if the option
+        save_frozen_results is set, if not in safe mode and if the frozen
+        results file has a valid signature.
+        Returns the number of restored results.
+
+        Parameters
+        ----------
+        filepath: String
+        \tFile path of the pyspread file, not of the frozen results file
+
+        """
+
+        if self.code_array.safe_mode or not config["save_frozen_results"]:
+            return 0
+
+        frozen_filepath = self._get_frozen_filepath(filepath)
+
+        if not os.path.isfile(frozen_filepath):
+            return 0
+
+        if not self.validate_signature(frozen_filepath):
+            # Frozen results are recomputed on demand
+            statustext = _("Frozen results file {filepath} is not properly "
+                           "signed and has not been loaded.")
+            statustext = statustext.format(filepath=frozen_filepath)
+            try:
+                post_command_event(self.main_window, self.StatusBarMsg,
+                                   text=statustext)
+            except TypeError:
+                # The main window does not exist any more
+                pass
+
+            return 0
+
+        try:
+            infile = bz2.BZ2File(frozen_filepath, "r")
+
+            try:
+                version, pickled_results = cPickle.load(infile)
+            finally:
+                infile.close()
+
+            if version != "0.1":
+                raise ValueError(version)
+
+            frozen_results = [(key, code, cPickle.loads(pickled_result))
+                              for key, code, pickled_result in pickled_results]
+
+        except Exception:
+            # Frozen results are recomputed on demand if they cannot be read
+            statustext = _("Frozen results file {filepath} unreadable.")
+            statustext = statustext.format(filepath=frozen_filepath)
+            try:
+                post_command_event(self.main_window, self.StatusBarMsg,
+                                   text=statustext)
+            except TypeError:
+                # The main window does not exist any more
+                pass
+
+            return 0
+
+        return self.code_array.set_frozen_results(frozen_results)
+
+    def save_frozen_results(self, filepath):
+        """Stores frozen cell results in a frozen results file
+
+        Each result is pickled separately so that results that cannot
+        be pickled are skipped. Numpy arrays are stored as binary data.
+        The frozen results file is signed if not in safe mode.
+        Returns the number of stored results.
+
+        Parameters
+        ----------
+        filepath: String
+        \tFile path of the pyspread file, not of the frozen results file
+
+        """
+
+        pickled_results = []
+
+        for key, code, result in self.code_array.get_frozen_results():
+            try:
+                pickled_result = cPickle.dumps(result,
+                                               cPickle.HIGHEST_PROTOCOL)
+
+            except Exception:
+                # Result cannot be pickled. It is recomputed after loading.
+                continue
+
+            pickled_results.append((key, code, pickled_result))
+
+        frozen_filepath = self._get_frozen_filepath(filepath)
+
+        try:
+            outfile = bz2.BZ2File(frozen_filepath, "wb")
+
+            try:
+                cPickle.dump(("0.1", pickled_results), outfile,
+                             cPickle.HIGHEST_PROTOCOL)
+            finally:
+                outfile.close()
+
+        except IOError:
+            statustext = _("Error writing to file {filepath}.")
+            statustext = statustext.format(filepath=frozen_filepath)
+            try:
+                post_command_event(self.main_window, self.StatusBarMsg,
+                                   text=statustext)
+            except TypeError:
+                # The main window does not exist any more
+                pass
+
+            return 0
+
+        # Only signed frozen results files are loaded
+        if not self.code_array.safe_mode:
+            self.sign_file(frozen_filepath)
+
+        return len(pickled_results)
+
     def sign_file(self, filepath):
         """Signs file if possible"""
 
@@ -522,6 +663,10 @@ class FileActions(Actions):
 
         outfile.close()
 
+        # Frozen results are stored next to the file if requested
+        if config["save_frozen_results"]:
+            self.save_frozen_results(filepath)
+
         self.saving = False
 
         # Mark content as unchanged
@@ -760,6 +905,9 @@ class TableActions(TableRowActionsMixin, TableColumnActionsMixin,
     def paste_to_current_cell(self, tl_key, data):
         """Pastes data into grid from top left cell tl_key
 
+        All pasted cells are written at once via code_array.set_cells so that
+        the paste is one undo step and the result cache is reset only once.
+
         Parameters
         ----------
 
@@ -781,7 +929,7 @@ class TableActions(TableRowActionsMixin, TableColumnActionsMixin,
         row_overflow = False
         col_overflow = False
 
-        no_pasted_cells = 0
+        key_values = []
 
         for src_row, row_data in enumerate(data):
             target_row = tl_row + src_row
@@ -805,59 +953,101 @@ class TableActions(TableRowActionsMixin, TableColumnActionsMixin,
                 if cell_data is not None:
                     # Is only None if pasting into selection
                     key = target_row, target_col, tl_tab
+                    key_values.append((key, cell_data))
 
-                    try:
-                        # Set cell but do not mark unredo
-                        # before pasting is finished
-
-                        self.grid.code_array.__setitem__(key, cell_data,
-                                                         mark_unredo=False)
-                        no_pasted_cells += 1
-                    except KeyError:
-                        pass
+        # Set all cells in one undo step
+        self.grid.code_array.set_cells(key_values)
 
         if row_overflow or col_overflow:
             self._show_final_overflow_message(row_overflow, col_overflow)
 
         else:
-            self._show_final_paste_message(tl_key, no_pasted_cells)
-
-        if no_pasted_cells:
-            # If cells have been pasted mark unredo operation
-            self.grid.code_array.unredo.mark()
+            self._show_final_paste_message(tl_key, len(key_values))
 
         self.pasting = False
 
-    def selection_paste_data_gen(self, selection, data):
-        """Generator that yields data for selection paste"""
+    def get_selection_paste_key_values(self, selection, data):
+        """Returns list of (key, value) tuples for selection paste
+
+        The data pattern is tiled over the selection bounding box. The
+        selection mask of the bounding box is computed once, and the target
+        keys and pattern indices are generated in one vectorized pass.
+
+        Parameters
+        ----------
+
+        selection: Selection
+        \tTarget selection, clipped to the grid shape
+        data: iterable of iterables where inner iterable returns string
+        \tThe outer iterable represents rows of the pattern
+
+        """
+
+        grid_rows, grid_cols, __ = self.grid.code_array.shape
+        tab = self.grid.current_table
 
         (bb_top, bb_left), (bb_bottom, bb_right) = \
             selection.get_grid_bbox(self.grid.code_array.shape)
-        bbox_height = bb_bottom - bb_top + 1
-        bbox_width = bb_right - bb_left + 1
+        bb_bottom = min(bb_bottom, grid_rows - 1)
+        bb_right = min(bb_right, grid_cols - 1)
 
-        for row, row_data in enumerate(itertools.cycle(data)):
-            # Break if row is not in selection bbox
-            if row >= bbox_height:
-                break
+        data = [list(row_data) for row_data in data]
+
+        if not data or bb_top > bb_bottom or bb_left > bb_right:
+            return []
+
+        # Pattern as object array, rows are padded with None
 
-            # Duplicate row data if selection is wider than row data
-            duplicated_row_data = row_data * (bbox_width // len(row_data) + 1)
-            duplicated_row_data = duplicated_row_data[:bbox_width]
+        row_lengths = numpy.array([len(row_data) for row_data in data])
+        pattern = numpy.empty((len(data), max(row_lengths.max(), 1)),
+                              dtype=object)
+        for row, row_data in enumerate(data):
+            pattern[row, :len(row_data)] = row_data
 
-            for col in xrange(len(duplicated_row_data)):
-                if (bb_top, bb_left + col) not in selection:
-                    duplicated_row_data[col] = None
+        # Selected cells relative to the bounding box
 
-            yield duplicated_row_data
+        rows, cols = numpy.nonzero(selection.mask(((bb_top, bb_left),
+                                                   (bb_bottom, bb_right))))
+
+        src_rows = rows % len(data)
+        src_lengths = row_lengths[src_rows]
+
+        # Empty pattern rows do not paste anything
+        non_empty = src_lengths > 0
+        rows = rows[non_empty]
+        cols = cols[non_empty]
+        src_rows = src_rows[non_empty]
+
+        src_cols = cols % src_lengths[non_empty]
+
+        values = pattern[src_rows, src_cols].tolist()
+        target_rows = (rows + bb_top).tolist()
+        target_cols = (cols + bb_left).tolist()
+
+        return [((row, col, tab), value) for row, col, value
+                in itertools.izip(target_rows, target_cols, values)
+                if value is not None]
 
     def paste_to_selection(self, selection, data):
-        """Pastes data into grid selection"""
+        """Pastes data into grid selection
 
-        (bb_top, bb_left), (bb_bottom, bb_right) = \
+        The data is repeated if the selection is larger than the data.
+        All cells are written in one undo step via code_array.set_cells.
+
+        """
+
+        self.pasting = True
+
+        (bb_top, bb_left), __ = \
             selection.get_grid_bbox(self.grid.code_array.shape)
-        adjusted_data = self.selection_paste_data_gen(selection, data)
-        self.paste_to_current_cell((bb_top, bb_left), adjusted_data)
+
+        key_values = self.get_selection_paste_key_values(selection, data)
+
+        self.grid.code_array.set_cells(key_values)
+
+        self._show_final_paste_message((bb_top, bb_left), len(key_values))
+
+        self.pasting = False
 
     def paste(self, tl_key, data):
         """Pastes data into grid, marks grid changed
@@ -891,6 +1081,69 @@ class TableActions(TableRowActionsMixin, TableColumnActionsMixin,
             # There is no selection.  Paste from top left cell.
             self.paste_to_current_cell(tl_key, data)
 
+    def import_txt(self, tl_key, txt_gen, chunk_size=10000):
+        """Imports whitespace separated text into grid, marks grid changed
+
+        In contrast to paste, the cells are written in chunks of rows via
+        code_array.set_cells. The whole import is one undo step.
+
+        Parameters
+        ----------
+
+        tl_key: Tuple
+        \tKey of top left cell of import area
+        txt_gen: TxtGenerator
+        \tRows of import data, clipped to the grid shape below tl_key
+        chunk_size: Integer, defaults to 10000
+        \tNumber of rows that are written into the grid at once
+
+        """
+
+        # Mark content as changed
+        post_command_event(self.main_window, self.ContentChangedMsg,
+                           changed=True)
+
+        self.pasting = True
+        self.need_abort = False
+
+        tl_row, tl_col, tl_tab = self._get_full_key(tl_key)
+
+        code_array = self.grid.code_array
+
+        key_values = []
+        no_imported_cells = 0
+
+        for src_row, row_data in enumerate(txt_gen):
+            if self.grid.actions._is_aborted(src_row, _("Importing rows... "),
+                                             freq=chunk_size):
+                code_array.set_cells(key_values, mark_unredo=False)
+                code_array.unredo.mark()
+                self._abort_paste()
+                return False
+
+            target_row = tl_row + src_row
+
+            key_values.extend(((target_row, tl_col + src_col, tl_tab), value)
+                              for src_col, value in enumerate(row_data))
+
+            if src_row % chunk_size == chunk_size - 1:
+                code_array.set_cells(key_values, mark_unredo=False)
+                no_imported_cells += len(key_values)
+                key_values = []
+
+        code_array.set_cells(key_values, mark_unredo=False)
+        no_imported_cells += len(key_values)
+
+        code_array.unredo.mark()
+
+        if txt_gen.row_overflow or txt_gen.col_overflow:
+            self._show_final_overflow_message(txt_gen.row_overflow,
+                                              txt_gen.col_overflow)
+        else:
+            self._show_final_paste_message(tl_key, no_imported_cells)
+
+        self.pasting = False
+
     def change_grid_shape(self, shape):
         """Grid shape change event handler, marks content as changed"""
 
@@ -1217,34 +1470,47 @@ class SelectionActions(Actions):
 
         selection = self.get_selection()
 
-        del_keys = \
-            [key for key in self.grid.code_array if key[:2] in selection]
+        code_array = self.grid.code_array
+        del_keys = code_array.iter_selection(selection,
+                                             self.grid.current_table)
 
-        for key in del_keys:
-            self.grid.actions.delete_cell(key)
+        code_array.set_cells([(key, None) for key in del_keys])
 
-        self.grid.code_array.result_cache.clear()
+        code_array.result_cache.clear()
 
 
 class FindActions(Actions):
     """Actions for finding inside the grid"""
 
-    def find(self, gridpos, find_string, flags):
-        """Return next position of event_find_string in MainGrid
+    def __init__(self, grid):
+        Actions.__init__(self, grid)
 
-        Parameters:
-        -----------
-        gridpos: 3-tuple of Integer
-        \tPosition at which the search starts
-        find_string: String
-        \tString to find in grid
-        flags: List of strings
-        \t Search flag out of
-        \t ["UP" xor "DOWN", "WHOLE_WORD", "MATCH_CASE", "REG_EXP"]
+        # Worker thread, which searches code and cached results
+        self.search_pool = ThreadPool(processes=1)
+
+        # Set for stopping the search in the worker thread
+        self.search_cancel = threading.Event()
+
+        # Search that may be continued by the next find call
+        # Format: (find_string, flags tuple, grid version, last match,
+        #          matches iterator)
+        self.search_state = None
+
+    def close(self):
+        """Stops the search worker thread
+
+        A running search is cancelled.
 
         """
 
-        findfunc = self.grid.code_array.findnextmatch
+        self.search_cancel.set()
+        self.search_state = None
+
+        self.search_pool.terminate()
+        self.search_pool.join()
+
+    def _get_search_start(self, gridpos, flags):
+        """Returns key of first cell that is searched from gridpos"""
 
         if "DOWN" in flags:
             if gridpos[0] < self.grid.code_array.shape[0]:
@@ -1265,7 +1531,101 @@ class FindActions(Actions):
             else:
                 gridpos = [dim - 1 for dim in self.grid.code_array.shape]
 
-        return findfunc(tuple(gridpos), find_string, flags)
+        return tuple(gridpos)
+
+    def _next_match(self, matches):
+        """Returns next key from matches or None, runs in worker thread
+
+        The main thread waits for the worker and stays responsive.
+        If the user presses <Esc> then the search is cancelled.
+
+        Parameters
+        ----------
+
+        matches: Iterator
+        \tKeys of matching cells
+
+        """
+
+        self.search_cancel.clear()
+
+        async_result = self.search_pool.apply_async(next, (matches, None))
+
+        cycle = 0
+        while not async_result.ready():
+            async_result.wait(0.1)
+
+            if not async_result.ready() and \
+               self.grid.actions._is_aborted(cycle, _("Searching... "),
+                                             freq=1):
+                self.search_cancel.set()
+                async_result.wait()
+                return
+
+            cycle += 1
+
+        return async_result.get()
+
+    def find(self, gridpos, find_string, flags):
+        """Return next position of event_find_string in MainGrid
+
+        Code strings and cached results are searched in a worker thread.
+        If there is no such match then the remaining cells are evaluated.
+        A find that starts at the previous match continues the previous
+        search so that only the cells up to the next match are visited.
+
+        Parameters:
+        -----------
+        gridpos: 3-tuple of Integer
+        \tPosition at which the search starts
+        find_string: String
+        \tString to find in grid
+        flags: List of strings
+        \t Search flag out of
+        \t ["UP" xor "DOWN", "WHOLE_WORD", "MATCH_CASE", "REG_EXP"]
+
+        """
+
+        code_array = self.grid.code_array
+        version = code_array.dict_grid.version
+        search = find_string, tuple(flags), version
+
+        findpos = None
+        self.need_abort = False
+
+        state = self.search_state
+        if state is not None and state[:4] == search + (tuple(gridpos),):
+            # Continue previous search
+            matches = state[4]
+            findpos = self._next_match(matches)
+
+        if findpos is None and not self.need_abort:
+            startkey = self._get_search_start(list(gridpos), flags)
+            matches = code_array.iter_matches(startkey, find_string, flags,
+                                              cancel=self.search_cancel.is_set)
+            findpos = self._next_match(matches)
+
+        if findpos is None and not self.need_abort:
+            # Evaluate cells without cached results in the main thread
+            cycles = itertools.count()
+            statustext = _("Evaluating cells for search... ")
+
+            def cancel():
+                return self.grid.actions._is_aborted(next(cycles), statustext)
+
+            matches = code_array.iter_matches(startkey, find_string, flags,
+                                              evaluate=True, cancel=cancel)
+            findpos = next(matches, None)
+
+            # The evaluating search must not be continued in the worker
+            matches = None
+
+        if findpos is None or matches is None:
+            self.search_state = None
+        else:
+            self.search_state = search + (findpos, matches)
+
+        return findpos
 
     def replace(self, findpos, find_string, replace_string):
         """Replaces occurrences of find_string with replace_string at findpos
@@ -1300,6 +1660,105 @@ class FindActions(Actions):
         post_command_event(self.main_window, self.StatusBarMsg,
                            text=statustext)
 
+    def find_all(self, find_string, flags):
+        """Returns list of keys of all matching cells in search order
+
+        All cells are searched in one scan, starting with the top left cell.
+        Returns None if the search is aborted.
+
+        Parameters
+        ----------
+
+        find_string: String
+        \tString to find in grid
+        flags: List of strings
+        \t Search flag out of
+        \t ["UP" xor "DOWN", "WHOLE_WORD", "MATCH_CASE", "REG_EXP"]
+        \t The search direction is ignored.
+
+        """
+
+        self.need_abort = False
+
+        cycles = itertools.count()
+        statustext = _("Searching cells... ")
+
+        def cancel():
+            return self.grid.actions._is_aborted(next(cycles), statustext)
+
+        flags = [flag for flag in flags if flag not in ("UP", "DOWN")]
+
+        matches = self.grid.code_array.iter_matches(
+            (0, 0, 0), find_string, flags + ["DOWN"], evaluate=True,
+            cancel=cancel)
+
+        found_keys = list(matches)
+
+        if self.need_abort:
+            statustext = _("Search aborted.")
+            found_keys = None
+
+        else:
+            statustext = _("Found '{text}' in {no_cells} cells.")
+            statustext = statustext.format(text=find_string,
+                                           no_cells=len(found_keys))
+
+        post_command_event(self.main_window, self.StatusBarMsg,
+                           text=statustext)
+
+        return found_keys
+
+    def replace_all(self, find_string, replace_string, flags):
+        """Replaces find_string with replace_string in the code of all cells
+
+        Only code is changed. The search pattern is compiled once and all
+        changed cells are written in one operation, which is one undo step.
+        Returns the number of changed cells.
+
+        Parameters
+        ----------
+
+        find_string: String
+        \tString to be overwritten in the cells
+        replace_string: String
+        \tString to be used for replacement, may contain group references
+        \tif "REG_EXP" is in flags
+        flags: List of strings
+        \t Search flag out of
+        \t ["UP" xor "DOWN", "WHOLE_WORD", "MATCH_CASE", "REG_EXP"]
+
+        """
+
+        regex = self.grid.code_array.get_search_regex(find_string, flags)
+
+        if "REG_EXP" in flags:
+            replacement = replace_string
+        else:
+            replacement = lambda match: replace_string
+
+        key_values = []
+
+        for key, old_code in self.grid.code_array.dict_grid.iteritems():
+            new_code, no_replacements = regex.subn(replacement, old_code)
+            if no_replacements:
+                key_values.append((key, new_code))
+
+        no_cells = self.grid.code_array.set_cells(key_values)
+
+        if no_cells:
+            # Mark content as changed
+            post_command_event(self.main_window, self.ContentChangedMsg,
+                               changed=True)
+
+        statustext = _("Replaced {old} with {new} in {no_cells} cells.")
+        statustext = statustext.format(old=find_string, new=replace_string,
+                                       no_cells=no_cells)
+
+        post_command_event(self.main_window, self.StatusBarMsg,
+                           text=statustext)
+
+        return no_cells
+
 
 class AllGridActions(FileActions, TableActions, UnRedoActions,
                      GridActions, SelectionActions, FindActions, CellActions):
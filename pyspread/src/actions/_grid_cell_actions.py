@@ -304,7 +304,7 @@ class CellActions(Actions):
 
         cursor = self.grid.actions.cursor
 
-        frozen = self.grid.code_array.cell_attributes[cursor]["frozen"]
+        frozen = self.grid.code_array.is_frozen(cursor)
 
         if frozen:
             # We have an frozen cell that has to be unfrozen
@@ -455,17 +455,21 @@ class CellActions(Actions):
         if not selection:
             selection.cells.append(self.grid.actions.cursor[:2])
 
-        cell_attributes = self.grid.code_array.cell_attributes
+        code_array = self.grid.code_array
+        tab = self.grid.actions.cursor[2]
+
+        keys = [key for key in code_array.iter_selection(selection, tab)
+                if code_array.is_frozen(key)]
+
+        code_array.refresh_frozen_cells(keys)
+
+    def refresh_frozen_cells(self):
+        """Refreshes content of all frozen cells"""
+
+        no_cells = self.grid.code_array.refresh_frozen_cells()
+
+        statustext = _("{no_cells} frozen cells refreshed.")
+        statustext = statustext.format(no_cells=no_cells)
 
-        for attr_selection, tab, attr_dict in cell_attributes:
-            if tab == self.grid.actions.cursor[2] and \
-               "frozen" in attr_dict and attr_dict["frozen"]:
-                # Only single cells are allowed for freezing
-                skey = attr_selection.cells[0]
-                if skey in selection:
-                    key = tuple(list(skey) + [tab])
-                    code = self.grid.code_array(key)
-                    result = self.grid.code_array._eval_cell(key, code)
-                    self.grid.code_array.frozen_cache[repr(key)] = result
-
-        cell_attributes._attr_cache.clear()
\ No newline at end of file
+        post_command_event(self.main_window, self.StatusBarMsg,
+                           text=statustext)
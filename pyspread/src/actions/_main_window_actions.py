@@ -43,6 +43,8 @@ Provides:
 import ast
 import base64
 import bz2
+from itertools import groupby, izip
+from operator import itemgetter
 import os
 
 import wx
@@ -97,9 +99,18 @@ class ExchangeActions(Actions):
                             path, dialect, digest_types, has_header)
 
     def _import_txt(self, path):
-        """Whitespace-delimited txt import workflow. This should be fast."""
+        """Whitespace-delimited txt import workflow. This should be fast.
 
-        return TxtGenerator(self.main_window, path)
+        Data that does not fit into the grid below and right of the cursor
+        is not tokenized.
+
+        """
+
+        row, col, __ = self.grid.actions.cursor
+        rows, cols, __ = self.grid.code_array.shape
+
+        return TxtGenerator(self.main_window, path,
+                            shape=(rows - row, cols - col))
 
     def import_file(self, filepath, filterindex):
         """Imports external file
@@ -305,15 +316,54 @@ class ClipboardActions(Actions):
 
         """
 
-        data = self.grid.code_array(key)
-        self.grid.code_array.result_cache.clear()
+        return self.grid.code_array(key)
+
+    def _get_copy_bbox(self, selection):
+        """Returns ((top, left), (bottom, right)) of area to be copied
+
+        The area is the cursor cell if there is no selection.
+
+        """
+
+        if not selection:
+            # There is no selection
+            bb_top, bb_left = self.grid.actions.cursor[:2]
+            return (bb_top, bb_left), (bb_top, bb_left)
 
-        return data
+        replace_none = self.main_window.grid.actions._replace_bbox_none
+        return replace_none(selection.get_bbox())
+
+    def _get_copy_keys(self, selection, bbox):
+        """Generator of populated keys in bbox that shall be copied
+
+        Keys are yielded in row major order. If there is a selection then
+        only keys inside the selection are yielded.
+
+        """
+
+        tab = self.grid.current_table
+
+        keys = self.grid.code_array.iter_populated(bbox, tab)
+
+        # Only copy content if cell is in selection or
+        # if there is no selection
+
+        if not selection:
+            for key in keys:
+                yield key
+
+        else:
+            keys = list(keys)
+            for key, selected in izip(keys, selection.contains_many(keys)):
+                if selected:
+                    yield key
 
     def copy(self, selection, getter=None, delete=False):
         """Returns code from selection in a tab separated string
 
         Cells that are not in selection are included as empty.
+        Only populated cells inside the bounding box are visited. Their
+        content is written into a preallocated buffer of empty lines.
 
         Parameters
         ----------
@@ -330,76 +380,84 @@ class ClipboardActions(Actions):
         if getter is None:
             getter = self._get_code
 
-        tab = self.grid.current_table
+        (bb_top, bb_left), (bb_bottom, bb_right) = bbox = \
+            self._get_copy_bbox(selection)
 
-        selection_bbox = selection.get_bbox()
+        width = bb_right - bb_left + 1
 
-        if not selection_bbox:
-            # There is no selection
-            bb_top, bb_left = self.grid.actions.cursor[:2]
-            bb_bottom, bb_right = bb_top, bb_left
-        else:
-            replace_none = self.main_window.grid.actions._replace_bbox_none
-            (bb_top, bb_left), (bb_bottom, bb_right) = \
-                replace_none(selection.get_bbox())
+        # Buffer of lines that are filled row by row
+        lines = [u"\t" * (width - 1)] * (bb_bottom - bb_top + 1)
 
-        data = []
+        copied_keys = []
 
-        for __row in xrange(bb_top, bb_bottom + 1):
-            data.append([])
+        keys = self._get_copy_keys(selection, bbox)
 
-            for __col in xrange(bb_left, bb_right + 1):
-                # Only copy content if cell is in selection or
-                # if there is no selection
+        for row, row_keys in groupby(keys, itemgetter(0)):
+            line = [u""] * width
 
-                if (__row, __col) in selection or not selection_bbox:
-                    content = getter((__row, __col, tab))
+            for key in row_keys:
+                content = getter(key)
 
-                    # Delete cell if delete flag is set
+                if content is not None:
+                    line[key[1] - bb_left] = content
 
-                    if delete:
-                        try:
-                            self.grid.code_array.pop((__row, __col, tab))
+                copied_keys.append(key)
 
-                        except KeyError:
-                            pass
+            lines[row - bb_top] = u"\t".join(line)
 
-                    # Store data
+        # Delete cells in one undo step if delete flag is set
 
-                    if content is None:
-                        data[-1].append(u"")
+        if delete and copied_keys:
+            self.grid.code_array.set_cells((key, None) for key in copied_keys)
 
-                    else:
-                        data[-1].append(content)
+        return u"\n".join(lines)
 
-                else:
-                    data[-1].append(u"")
+    @staticmethod
+    def _result2string(result_obj):
+        """Returns unicode string of result object"""
 
-        return "\n".join("\t".join(line) for line in data)
+        try:
+            # Numpy object arrays are converted because of numpy repr bug
+            result_obj = result_obj.tolist()
+
+        except AttributeError:
+            pass
+
+        return unicode(result_obj)
 
-    def _get_result_string(self, key):
-        """Returns unicode string of result for given key (one cell)
+    def _get_result_strings(self, keys):
+        """Returns dict of unicode result strings for keys, None if aborted
+
+        The cells are evaluated and converted in the main thread. Because
+        of the GIL, converting results on threads would not be faster.
+        The user may abort by pressing <Esc>.
 
         Parameters
         ----------
 
-        key: 3-Tuple of Integer
-        \t Cell key
+        keys: List of 3-Tuples of Integer
+        \t Cell keys
 
         """
 
-        row, col, tab = key
+        grid_actions = self.grid.actions
+        grid_actions.need_abort = False
 
-        result_obj = self.grid.code_array[row, col, tab]
+        code_array = self.grid.code_array
+        result2string = self._result2string
 
-        try:
-            # Numpy object arrays are converted because of numpy repr bug
-            result_obj = result_obj.tolist()
+        no_keys = len(keys)
 
-        except AttributeError:
-            pass
+        strings = []
 
-        return unicode(result_obj)
+        for i, key in enumerate(keys):
+            if grid_actions._is_aborted(i, _("Copying results... "),
+                                        total_elements=no_keys):
+                return
+
+            strings.append(result2string(code_array[key]))
+
+        return dict(izip(keys, strings))
 
     def copy_result(self, selection):
         """Returns result
@@ -408,18 +466,12 @@ class ClipboardActions(Actions):
         the bitmap is returned.
         Otherwise the method returns string representations of the result
         for the given selection in a tab separated string.
+        None is returned if the operation has been aborted.
 
         """
 
-        bbox = selection.get_bbox()
-
-        if not bbox:
-            # There is no selection
-            bb_top, bb_left = self.grid.actions.cursor[:2]
-            bb_bottom, bb_right = bb_top, bb_left
-        else:
-            # Thereis a selection
-            (bb_top, bb_left), (bb_bottom, bb_right) = bbox
+        bbox = self._get_copy_bbox(selection)
+        (bb_top, bb_left), (bb_bottom, bb_right) = bbox
 
         if bb_top == bb_bottom and bb_left == bb_right:
             # We have  a single selection
@@ -445,9 +497,17 @@ class ClipboardActions(Actions):
                                dpi, zoom)
 
         # So we have result strings to be returned
-        getter = self._get_result_string
 
-        return self.copy(selection, getter=getter)
+        keys = list(self._get_copy_keys(selection, bbox))
+        result_strings = self._get_result_strings(keys)
+
+        if result_strings is None:
+            statustext = _("Copy aborted.")
+            post_command_event(self.main_window, self.StatusBarMsg,
+                               text=statustext)
+            return
+
+        return self.copy(selection, getter=result_strings.get)
 
     def bmp2code(self, key, bmp):
         """Pastes bitmap into single cell"""
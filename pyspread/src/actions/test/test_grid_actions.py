@@ -40,6 +40,7 @@ sys.path.insert(0, TESTPATH)
 sys.path.insert(0, TESTPATH + "/../../..")
 sys.path.insert(0, TESTPATH + "/../..")
 
+from src.config import config
 from src.gui._main_window import MainWindow
 from src.lib.selection import Selection
 
@@ -215,6 +216,26 @@ class TestFileActions(object):
         result_cache = self.grid.code_array.result_cache
         assert len(result_cache) == 0
 
+    def test_clear_frozen_keys(self):
+        """Frozen keys of a cleared grid are not reused"""
+
+        code_array = self.grid.code_array
+        cell_attributes = code_array.cell_attributes
+
+        selection = Selection([], [], [], [], [(0, 0)])
+        self.grid.actions.set_attr("frozen", True, selection)
+
+        assert code_array.is_frozen((0, 0, 0))
+
+        self.grid.actions.clear()
+
+        # Same number of attributes as before, as after parsing a file
+        selection = Selection([], [], [], [], [(1, 0)])
+        cell_attributes.append((selection, 0, {"frozen": True}))
+
+        assert not code_array.is_frozen((0, 0, 0))
+        assert code_array.is_frozen((1, 0, 0))
+
     def test_open(self):
         """Tests open functionality"""
 
@@ -318,6 +339,71 @@ class TestFileActions(object):
         os.remove(self.filename_save)
         os.remove(self.filename_save + ".sig")
 
+    def test_save_load_frozen_results(self):
+        """Tests save_frozen_results and load_frozen_results"""
+
+        old_save_frozen_results = config.data.save_frozen_results
+        config["save_frozen_results"] = "True"
+
+        frozen_filepath = self.filename_save + ".frozen"
+
+        self.grid.actions.leave_safe_mode()
+
+        self.code_array[(0, 0, 0)] = "'Test1'"
+        self.code_array[(1, 0, 0)] = "'Test2'"
+
+        selection = Selection([], [], [], [], [(0, 0), (1, 0)])
+        self.grid.actions.set_attr("frozen", True, selection)
+        self.code_array.refresh_frozen_cells()
+
+        try:
+            assert self.grid.actions.save_frozen_results(
+                self.filename_save) == 2
+
+            # The frozen results file is signed
+            assert os.path.isfile(frozen_filepath + ".sig")
+
+            # Results are restored without evaluation
+            self.code_array.frozen_cache.clear()
+            self.code_array[(1, 0, 0)] = "'Test3'"
+
+            assert self.grid.actions.load_frozen_results(
+                self.filename_save) == 1
+            assert self.code_array.frozen_cache[repr((0, 0, 0))] == "Test1"
+            assert repr((1, 0, 0)) not in self.code_array.frozen_cache
+
+            # Frozen results files are not loaded in safe mode
+            self.code_array.frozen_cache.clear()
+            self.grid.actions.enter_safe_mode()
+
+            assert self.grid.actions.load_frozen_results(
+                self.filename_save) == 0
+            assert not self.code_array.frozen_cache
+
+            self.grid.actions.leave_safe_mode()
+
+            # Frozen results files are not loaded if the option is unset
+            config["save_frozen_results"] = "False"
+
+            assert self.grid.actions.load_frozen_results(
+                self.filename_save) == 0
+
+            config["save_frozen_results"] = "True"
+
+            # Frozen results files without signature are not loaded
+            os.remove(frozen_filepath + ".sig")
+
+            assert self.grid.actions.load_frozen_results(
+                self.filename_save) == 0
+            assert not self.code_array.frozen_cache
+
+        finally:
+            config["save_frozen_results"] = old_save_frozen_results
+
+            for filepath in frozen_filepath, frozen_filepath + ".sig":
+                if os.path.isfile(filepath):
+                    os.remove(filepath)
+
     def test_sign_file(self):
         """Tests signing functionality"""
 
@@ -545,6 +631,48 @@ class TestTableActions(object):
         basic_setup_test(self.grid, self.grid.actions.paste, test_key,
                          test_val, tl_cell, data)
 
+    def test_paste_undo(self):
+        """Tests that a paste is undone in one step"""
+
+        restore_basic_grid(self.grid)
+
+        self.grid.actions.paste((0, 0, 0), [["5", "6"], ["7", "8"]])
+
+        assert self.grid.code_array((1, 1, 0)) == "8"
+
+        self.grid.actions.undo()
+
+        assert self.grid.code_array((0, 0, 0)) == "'Test'"
+        assert self.grid.code_array((1, 1, 0)) == "3"
+
+    param_paste_to_selection = [
+        {'selection': Selection([(0, 0)], [(3, 3)], [], [], []),
+         'data': [["1", "2"], ["3", "4"]],
+         'test_key': (2, 3, 0), 'test_val': "2"},
+        {'selection': Selection([(0, 0)], [(3, 3)], [], [], []),
+         'data': [["1", "2"], ["3", "4"]],
+         'test_key': (4, 0, 0), 'test_val': None},
+        {'selection': Selection([], [], [], [], [(1, 1), (2, 2)]),
+         'data': [["1", "2"], ["3", "4"]],
+         'test_key': (2, 2, 0), 'test_val': "4"},
+        {'selection': Selection([], [], [], [], [(1, 1), (2, 2)]),
+         'data': [["1", "2"], ["3", "4"]],
+         'test_key': (1, 2, 0), 'test_val': None},
+        {'selection': Selection([(998, 98)], [(1000, 100)], [], [], []),
+         'data': [["1", "2", "3"]],
+         'test_key': (999, 99, 0), 'test_val': "2"},
+    ]
+
+    @params(param_paste_to_selection)
+    def test_paste_to_selection(self, selection, data, test_key, test_val):
+        """Tests tiling paste into a selection"""
+
+        self.grid.actions.clear()
+
+        self.grid.actions.paste_to_selection(selection, data)
+
+        assert self.code_array(test_key) == test_val
+
     param_change_grid_shape = [
         {'shape': (1, 1, 1)},
         {'shape': (2, 1, 3)},
@@ -737,6 +865,76 @@ class TestFindActions(object):
         self.grid.actions.replace(findpos, find_string, replace_string)
         assert self.grid.code_array(findpos) == res
 
+    param_find_all = [
+        {'find_string': "test", 'flags': ["DOWN"],
+         'res': [(0, 0, 0), (1, 0, 0), (2, 0, 0)]},
+        {'find_string': "test", 'flags': ["UP", "MATCH_CASE"], 'res': []},
+        {'find_string': "Test", 'flags': ["UP", "WHOLE_WORD"],
+         'res': [(0, 0, 0)]},
+        {'find_string': "t[12]", 'flags': ["DOWN", "REG_EXP"],
+         'res': [(1, 0, 0), (2, 0, 0)]},
+    ]
+
+    @params(param_find_all)
+    def test_find_all(self, find_string, flags, res):
+        """Tests for find_all"""
+
+        assert self.grid.actions.find_all(find_string, flags) == res
+
+    param_replace_all = [
+        {'find_string': "test", 'replace_string': "Hello", 'flags': ["DOWN"],
+         'res': ["Hello", "Hello1", "Hello2"]},
+        {'find_string': "Test1", 'replace_string': "",
+         'flags': ["DOWN", "MATCH_CASE"], 'res': ["Test", None, "Test2"]},
+        {'find_string': "Test", 'replace_string': "Hello",
+         'flags': ["DOWN", "WHOLE_WORD"], 'res': ["Hello", "Test1", "Test2"]},
+        {'find_string': "t([12])", 'replace_string': r"t_\1",
+         'flags': ["DOWN", "REG_EXP"], 'res': ["Test", "Test_1", "Test_2"]},
+    ]
+
+    @params(param_replace_all)
+    def test_replace_all(self, find_string, replace_string, flags, res):
+        """Tests for replace_all"""
+
+        self.grid.actions.replace_all(find_string, replace_string, flags)
+
+        keys = [(0, 0, 0), (1, 0, 0), (2, 0, 0)]
+        assert [self.code_array(key) for key in keys] == res
+
+        # Replace all is one undo step
+        self.code_array.unredo.undo()
+        assert [self.code_array(key) for key in keys] == \
+            ["Test", "Test1", "Test2"]
+
+    param_find_replace_all = [
+        {'find_string': "Test", 'flags': ["DOWN", "WHOLE_WORD"]},
+        {'find_string': "Tes+", 'flags': ["DOWN", "WHOLE_WORD"]},
+        {'find_string': "t.", 'flags': ["DOWN"]},
+        {'find_string': r"st\d", 'flags': ["DOWN", "REG_EXP"]},
+    ]
+
+    @params(param_find_replace_all)
+    def test_find_replace_all(self, find_string, flags):
+        """Replace all changes exactly the cells that find all finds"""
+
+        found_keys = self.grid.actions.find_all(find_string, flags)
+        no_cells = self.grid.actions.replace_all(find_string, "X", flags)
+
+        assert no_cells == len(found_keys)
+
+    def test_close(self):
+        """Tests for close"""
+
+        assert self.grid.actions.find((0, 0, 0), "test", ["DOWN"]) == \
+            (1, 0, 0)
+
+        self.grid.actions.close()
+
+        assert self.grid.actions.search_cancel.is_set()
+        assert self.grid.actions.search_state is None
+        assert all(not worker.is_alive()
+                   for worker in self.grid.actions.search_pool._pool)
+
 
 class TestAllGridActions(object):
     """AllGridActions test class"""
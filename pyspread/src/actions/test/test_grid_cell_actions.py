@@ -324,3 +324,24 @@ class TestCellActions(object):
         selection = Selection([], [], [], [], [cell[:2]])
         self.grid.actions.refresh_selected_frozen_cells(selection=selection)
         assert self.grid.code_array[cell] == 2
+
+    def test_refresh_frozen_cells(self):
+        """Unit test for refresh_frozen_cells"""
+
+        cells = [(0, 0, 0), (3, 2, 1)]
+
+        for cell in cells:
+            self.grid.code_array[cell] = "1"
+
+            self.grid.actions.cursor = cell
+            self.grid.current_table = cell[2]
+            self.grid.actions.change_frozen_attr()
+
+        for cell in cells:
+            self.grid.code_array[cell] = "2"
+            assert self.grid.code_array[cell] == 1
+
+        self.grid.actions.refresh_frozen_cells()
+
+        for cell in cells:
+            assert self.grid.code_array[cell] == 2
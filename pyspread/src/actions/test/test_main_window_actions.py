@@ -235,6 +235,8 @@ class TestClipboardActions(object):
         {'selection': Selection([], [], [], [], [(999, 0)]), 'result': "1"},
         {'selection': Selection([], [], [], [], [(999, 99)]),
          'result': "invalid syntax (<unknown>, line 1)"},
+        {'selection': Selection([(0, 1)], [(1, 2)], [], [], []),
+         'result': "1\t2\n3\t4"},
     ]
 
     @params(param_copy_result)
@@ -26,6 +26,7 @@ pyspread config file
 """
 
 from ast import literal_eval
+import os
 
 import wx
 
@@ -73,9 +74,42 @@ class DefaultConfig(object):
 
         self.max_unredo = "5000"
 
+        # Store results of frozen cells in a file next to the save file
+        self.save_frozen_results = repr(False)
+
+        # Persistent cache for results of cells that take long to evaluate
+        self.persistent_cache = repr(False)
+        self.persistent_cache_path = \
+            repr(os.path.join(standardpaths.GetUserLocalDataDir(),
+                              "result_cache"))
+
+        # Maximum total size of the persistent cache in bytes
+        self.persistent_cache_size = "500000000"
+
+        # Minimum evaluation time in seconds for persistently cached results
+        self.persistent_cache_min_time = "0.5"
+
         # Maximum result length in a cell in characters
         self.max_result_length = "1000"
 
+        # Maximum estimated memory size of cached cell results in bytes
+        self.max_result_cache_bytes = "1000000000"
+
+        # Maximum number of pixels in cached cell background bitmaps
+        self.max_background_cache_pixels = "20000000"
+
+        # Maximum number of pixels in cached bitmaps of rendered text cells
+        self.max_tile_cache_pixels = "20000000"
+
+        # Maximum number of pixels in cached bitmaps of chart cells
+        self.max_chart_cache_pixels = "20000000"
+
+        # Maximum number of pixels in cached scaled bitmaps of image cells
+        self.max_bitmap_cache_pixels = "20000000"
+
+        # Maximum number of pixels in decoded bitmaps of pasted images
+        self.max_decoded_bitmap_cache_pixels = "20000000"
+
         # Colors
         self.grid_color = repr(get_color(wx.SYS_COLOUR_3DSHADOW))
         self.selection_color = repr(get_color(wx.SYS_COLOUR_HIGHLIGHT))
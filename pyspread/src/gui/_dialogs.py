@@ -1123,7 +1123,8 @@ class CheckBoxCtrl(wx.CheckBox):
 
         return repr(self.GetValue())
 
-    Value = property(get_value_str, wx.CheckBox.SetValue)
+    # The preferences dialog stores repr(Value), so Value is a bool
+    Value = property(wx.CheckBox.GetValue, wx.CheckBox.SetValue)
 
 # end of class CheckBoxCtrl
 
@@ -1167,6 +1168,22 @@ class PreferencesDialog(wx.Dialog):
             "widget_params": {"min": 0, "allow_long": True},
             "prepocessor": int,
         }),
+        ("save_frozen_results", {
+            "label": _(u"Save frozen results"),
+            "tooltip": _(u"Store results of frozen cells in a file next "
+                         u"to the save file"),
+            "widget": CheckBoxCtrl,
+            "widget_params": {},
+            "prepocessor": bool,
+        }),
+        ("persistent_cache", {
+            "label": _(u"Persistent result cache"),
+            "tooltip": _(u"Store results of cells that take long to evaluate "
+                         u"in a cache directory for reuse"),
+            "widget": CheckBoxCtrl,
+            "widget_params": {},
+            "prepocessor": bool,
+        }),
         ("gpg_key_uid", {
             "label": _(u"GPG key name"),
             "tooltip": _(u"Name of the GPG key for signing files"),
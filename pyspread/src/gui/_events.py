@@ -173,6 +173,7 @@ class GridEventMixin(object):
     # Grid view events
 
     RefreshSelectionMsg, EVT_CMD_REFRESH_SELECTION = new_command_event()
+    RefreshFrozenMsg, EVT_CMD_REFRESH_FROZEN = new_command_event()
     DisplayGotoCellDialogMsg, EVT_CMD_DISPLAY_GOTO_CELL_DIALOG = \
                                                         new_command_event()
     GotoCellMsg, EVT_CMD_GOTO_CELL = new_command_event()
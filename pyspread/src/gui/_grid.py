@@ -30,6 +30,8 @@ Provides
 
 """
 
+from itertools import izip
+
 import wx.grid
 
 from _events import post_command_event, EventMixin
@@ -42,7 +44,6 @@ from _chart_dialog import ChartDialog
 
 import src.lib.i18n as i18n
 
-import src.lib.xrect as xrect
 from src.model.model import CodeArray
 
 from src.actions._grid_actions import AllGridActions
@@ -214,6 +215,8 @@ class Grid(wx.grid.Grid, EventMixin):
 
         main_window.Bind(self.EVT_CMD_REFRESH_SELECTION,
                          handlers.OnRefreshSelectedCells)
+        main_window.Bind(self.EVT_CMD_REFRESH_FROZEN,
+                         handlers.OnRefreshFrozenCells)
         main_window.Bind(self.EVT_CMD_DISPLAY_GOTO_CELL_DIALOG,
                          handlers.OnDisplayGoToCellDialog)
         main_window.Bind(self.EVT_CMD_GOTO_CELL, handlers.OnGoToCell)
@@ -251,6 +254,10 @@ class Grid(wx.grid.Grid, EventMixin):
         main_window.Bind(self.EVT_CMD_UNDO, handlers.OnUndo)
         main_window.Bind(self.EVT_CMD_REDO, handlers.OnRedo)
 
+        # Grid destruction
+
+        self.Bind(wx.EVT_WINDOW_DESTROY, handlers.OnDestroy)
+
     _get_selection = lambda self: self.actions.get_selection()
     selection = property(_get_selection, doc="Grid selection")
 
@@ -311,7 +318,8 @@ class Grid(wx.grid.Grid, EventMixin):
                        row - vis_row_min, col - vis_col_min)
 
         for dist in xrange(get_max_visible_distance(row, col)):
-            all_empty = True
+            ring_cells = []
+            ring_rects = []
 
             for radius_cell in l1_radius_cells(dist + 1):
                 __row = radius_cell[0] + row
@@ -319,17 +327,60 @@ class Grid(wx.grid.Grid, EventMixin):
 
                 if self.IsVisible(__row, __col, wholeCellVisible=False):
                     cell_rect = self.CellToRect(__row, __col)
-                    cell_rect = xrect.Rect(cell_rect.x, cell_rect.y,
-                                           cell_rect.width, cell_rect.height)
-                    if textbox.collides_axisaligned_rect(cell_rect):
-                        all_empty = False
-                        yield dist + 1, __row, __col
+                    ring_cells.append((__row, __col))
+                    ring_rects.append((cell_rect.x, cell_rect.y,
+                                       cell_rect.width, cell_rect.height))
+
+            # All cells of a circle are tested in one batch
+
+            collisions = textbox.collides_axisaligned_rects(ring_rects)
 
             # If there are no collisions in a circle, we break
 
-            if all_empty:
+            if not collisions.any():
                 break
 
+            for (__row, __col), collision in izip(ring_cells, collisions):
+                if collision:
+                    yield dist + 1, __row, __col
+
+    def colliding_row_cells(self, row, col, x_min, x_max):
+        """Generates distance, row, col tuples of cells in row that overlap
+
+        In contrast to colliding_cells, only the horizontal range from x_min
+        to x_max is tested. The first and the last overlapping column are
+        found from the column offsets via XToCol. Therefore, the cost does
+        not depend on the number of cells that are checked for collision.
+
+        Parameters
+        ----------
+        row: Integer
+        \tRow of cell that is tested for collision
+        col: Integer
+        \tColumn of cell that is tested for collision
+        x_min: Number
+        \tLeft bound of horizontal range
+        x_max: Number
+        \tRight bound of horizontal range
+
+        """
+
+        last_col = self.GetNumberCols() - 1
+
+        def x_to_col(pos_x):
+            """Returns column at pos_x, clipped to the grid columns"""
+
+            if pos_x < 0:
+                return 0
+
+            __col = self.XToCol(pos_x)
+
+            return last_col if __col == wx.NOT_FOUND else __col
+
+        for __col in xrange(x_to_col(x_min), x_to_col(x_max) + 1):
+            if __col != col:
+                yield abs(__col - col), row, __col
+
     def get_block_direction(self, rect_row, rect_col, block_row, block_col):
         """Returns a blocking direction string from UP DOWN RIGHT LEFT"""
 
@@ -779,6 +830,19 @@ class GridEventHandlers(object):
         self.interfaces = grid.interfaces
         self.main_window = grid.main_window
 
+        # Timer that ends scrolling mode of the grid renderer
+        self.scroll_timer = None
+
+    def OnDestroy(self, event):
+        """Grid destroy event handler, stops worker threads"""
+
+        # Destroy events of child windows propagate to the grid
+        if event.GetEventObject() is self.grid:
+            self.grid.grid_renderer.close()
+            self.grid.actions.close()
+
+        event.Skip()
+
     def OnMouseMotion(self, event):
         """Mouse motion event handler"""
 
@@ -860,11 +924,34 @@ class GridEventHandlers(object):
 
         event.Skip()
 
+    def _set_scrolling(self, delay=300):
+        """Sets renderer scrolling mode until delay ms without scrolling"""
+
+        self.grid.grid_renderer.scrolling = True
+
+        if self.scroll_timer is None:
+            self.scroll_timer = wx.CallLater(delay, self.OnScrollEnd)
+        else:
+            self.scroll_timer.Restart(delay)
+
     def OnScroll(self, event):
         """Event handler for grid scroll event"""
 
+        self._set_scrolling()
+
         event.Skip()
 
+    def OnScrollEnd(self):
+        """Ends scrolling mode and redraws cells that were drawn in draft"""
+
+        grid_renderer = self.grid.grid_renderer
+
+        grid_renderer.scrolling = False
+
+        if grid_renderer.draft_drawn:
+            grid_renderer.draft_drawn = False
+            self.grid.ForceRefresh()
+
     def OnRangeSelected(self, event):
         """Event handler for grid selection"""
 
@@ -920,6 +1007,14 @@ class GridEventHandlers(object):
 
         event.Skip()
 
+    def OnRefreshFrozenCells(self, event):
+        """Event handler for refreshing all frozen cells via menu"""
+
+        self.grid.actions.refresh_frozen_cells()
+        self.grid.ForceRefresh()
+
+        event.Skip()
+
     def OnZoomIn(self, event):
         """Event handler for increasing grid zoom"""
 
@@ -961,6 +1056,7 @@ class GridEventHandlers(object):
             else:
                 post_command_event(self.grid, self.grid.ZoomOutMsg)
         else:
+            self._set_scrolling()
             event.Skip()
 
     # Find events
@@ -1045,8 +1141,13 @@ class GridEventHandlers(object):
     def OnReplaceAll(self, event):
         """Called when a replace all operation is started"""
 
-        while self.OnReplace(event) is not None:
-            pass
+        find_string = event.GetFindString()
+        flags = self._wxflag2flag(event.GetFlags())
+        replace_string = event.GetReplaceString()
+
+        self.grid.actions.replace_all(find_string, replace_string, flags)
+
+        self.grid.ForceRefresh()
 
         event.Skip()
 
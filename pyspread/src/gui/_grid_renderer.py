@@ -32,6 +32,7 @@ Provides
 """
 
 from math import pi, sin, cos
+from multiprocessing.pool import ThreadPool
 import types
 
 import wx.grid
@@ -40,7 +41,8 @@ import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot
 
-from src.lib.charts import fig2bmp
+from src.lib.cache import LRUCache
+from src.lib.charts import fig2bmp, fig2rgba
 import src.lib.i18n as i18n
 from src.lib import xrect
 from src.lib.parsers import get_pen_from_data, get_font_from_data
@@ -53,6 +55,12 @@ _ = i18n.language.ugettext
 class GridRenderer(wx.grid.PyGridCellRenderer):
     """This renderer draws borders and text at specified font, size, color"""
 
+    # Cell attributes that affect the rendering of text in addition to
+    # the background attributes
+    tile_attributes = ["textfont", "pointsize", "fontweight", "fontstyle",
+                       "underline", "strikethrough", "vertical_align",
+                       "justification", "angle", "textcolor"]
+
     def __init__(self, data_array):
 
         wx.grid.PyGridCellRenderer.__init__(self)
@@ -62,14 +70,118 @@ class GridRenderer(wx.grid.PyGridCellRenderer):
         # Background key is (width, height, bgbrush,
         # borderwidth_bottom, borderwidth_right,
         # bordercolor_bottom, bordercolor_right)
-        self.backgrounds = {}
+        # The cache size is measured in bitmap pixels
+        self.backgrounds = LRUCache(
+            config["max_background_cache_pixels"],
+            get_size=lambda bg: bg.rect.width * bg.rect.height)
+
+        # Font key is (textfont, zoomed pointsize, fontweight, fontstyle,
+        # underline). The cache size is measured in fonts.
+        self.fonts = LRUCache(1000)
+
+        # Layout key is (text, font key, angle, vertical_align,
+        # justification, cell width, cell height, dc key). The dc key
+        # separates layouts that are measured for screen and printer.
+        # The cache size is measured in layouts.
+        self.layouts = LRUCache(10000)
+
+        # Tile key is (text, first row flag, first column flag, background
+        # key) + text attribute values. Tiles are bitmaps of text cells or
+        # None if the text overflows the cell.
+        # The cache size is measured in bitmap pixels.
+        self.tiles = LRUCache(config["max_tile_cache_pixels"],
+                              get_size=self._get_tile_size)
+
+        # Tiles are selected into this DC for drawing so that cached tiles
+        # do not hold a device context each
+        self.tile_dc = wx.MemoryDC()
+
+        # Chart key is (figure id, width, height, dpi, zoom). Values are
+        # (figure, bitmap) tuples. The cache size is measured in pixels.
+        self.charts = LRUCache(config["max_chart_cache_pixels"],
+                               get_size=self._get_bitmap_pair_size)
+
+        # Scaled bitmap key is (source bitmap id, width, height, quality).
+        # Values are (source bitmap, scaled bitmap) tuples.
+        # The cache size is measured in pixels.
+        self.scaled_bitmaps = LRUCache(config["max_bitmap_cache_pixels"],
+                                       get_size=self._get_bitmap_pair_size)
+
+        # True while the grid is scrolled. Bitmaps are scaled in draft
+        # quality then. draft_drawn is set if this has happened.
+        self.scrolling = False
+        self.draft_drawn = False
+
+        # Charts are rendered in a worker thread. pending_charts maps cell
+        # keys to the chart key of their current render request.
+        self.chart_pool = ThreadPool(processes=1)
+        self.pending_charts = {}
+
+        # Number of cell attribute entries, for which the caches are valid
+        self._cell_attributes_len = len(data_array.cell_attributes)
 
         # Zoom of grid
-        self.zoom = 1.0
+        self._zoom = 1.0
 
         # Old curso position
         self.old_cursor_row_col = 0, 0
 
+    def close(self):
+        """Stops the chart worker thread
+
+        Render requests that have not been started are dropped.
+
+        """
+
+        self.chart_pool.terminate()
+        self.chart_pool.join()
+
+    def _get_zoom(self):
+        """Returns zoom of grid"""
+
+        return self._zoom
+
+    def _set_zoom(self, zoom):
+        """Sets zoom of grid and empties caches on change"""
+
+        if zoom != self._zoom:
+            self.clear_caches()
+
+        self._zoom = zoom
+
+    zoom = property(_get_zoom, _set_zoom)
+
+    def clear_caches(self):
+        """Empties all render caches"""
+
+        self.backgrounds.clear()
+        self.fonts.clear()
+        self.layouts.clear()
+        self.tiles.clear()
+        self.charts.clear()
+        self.scaled_bitmaps.clear()
+
+    def get_cache_stats(self):
+        """Returns dict that maps render cache names to cache statistics"""
+
+        return {
+            "backgrounds": self.backgrounds.get_stats(),
+            "fonts": self.fonts.get_stats(),
+            "layouts": self.layouts.get_stats(),
+            "tiles": self.tiles.get_stats(),
+            "charts": self.charts.get_stats(),
+            "scaled_bitmaps": self.scaled_bitmaps.get_stats(),
+        }
+
+    def _validate_caches(self):
+        """Empties render caches if cell attributes have changed"""
+
+        cell_attributes_len = len(self.data_array.cell_attributes)
+
+        if cell_attributes_len != self._cell_attributes_len:
+            self.clear_caches()
+            self._cell_attributes_len = cell_attributes_len
+
     def get_zoomed_size(self, size):
         """Returns zoomed size as Integer
 
@@ -119,8 +231,16 @@ class GridRenderer(wx.grid.PyGridCellRenderer):
 
         return pt_ul, pt_ll, pt_lr, pt_ur
 
-    def get_text_rotorect(self, text_pos, text_extent):
-        """Returns a RotoRect for given cell text"""
+    def get_text_rotorect(self, text_pos, text_extent, corners=None):
+        """Returns a RotoRect for given cell text
+
+        Parameters
+        ----------
+
+        corners: (4, 2) array, defaults to None
+        \tCorners of the text box from the text layout cache
+
+        """
 
         pt_ll = self.get_textbox_edges(text_pos, text_extent)[1]
 
@@ -129,7 +249,8 @@ class GridRenderer(wx.grid.PyGridCellRenderer):
 
         angle = float(text_pos[2])
 
-        return xrect.RotoRect(rr_x, rr_y, text_ext_x, text_ext_y, angle)
+        return xrect.RotoRect(rr_x, rr_y, text_ext_x, text_ext_y, angle,
+                              corners=corners)
 
     def draw_textbox(self, dc, text_pos, text_extent):
 
@@ -168,7 +289,8 @@ class GridRenderer(wx.grid.PyGridCellRenderer):
 
                 yield __row, __col, tab
 
-    def _get_empty_cells(self, dc, grid, key, text_pos, text_extent):
+    def _get_empty_cells(self, dc, grid, key, text_pos, text_extent,
+                         corners=None):
         """Generator of empty cells from key in direction
 
         Parameters
@@ -177,6 +299,8 @@ class GridRenderer(wx.grid.PyGridCellRenderer):
         \tCurrent cell
         text_pos: 3-tuple
         \tPosition and direction of text
+        corners: (4, 2) array, defaults to None
+        \tCorners of the text box from the text layout cache
 
         """
 
@@ -184,32 +308,57 @@ class GridRenderer(wx.grid.PyGridCellRenderer):
 
         blocking_distance = None
 
-        textbox = self.get_text_rotorect(text_pos, text_extent)
+        text_x, text_y, angle = text_pos
+        text_width, text_height = text_extent
 
-        for distance, __row, __col in grid.colliding_cells(row, col, textbox):
+        row_rect = grid.CellToRect(row, col)
+
+        if -0.0001 < angle < 0.0001 and row_rect.y <= text_y and \
+           text_y + text_height <= row_rect.y + row_rect.height:
+            # Unrotated text that fits into its row only overflows into
+            # cells of the same row. These are found via column offsets.
+            cells = sorted(grid.colliding_row_cells(row, col, text_x,
+                                                    text_x + text_width))
+
+        else:
+            textbox = self.get_text_rotorect(text_pos, text_extent,
+                                             corners=corners)
+            cells = grid.colliding_cells(row, col, textbox)
+
+        for distance, __row, __col in cells:
 
             if blocking_distance is None or distance == blocking_distance:
-                if self.data_array[__row, __col, tab] is not None and \
-                   self.data_array[__row, __col, tab] != "":
-                    blocking_distance = distance
-                else:
+                if self._is_empty_cell((__row, __col, tab)):
                     yield __row, __col, tab
+                else:
+                    blocking_distance = distance
+
+    def _is_empty_cell(self, key):
+        """Returns True if cell key has no code or an empty result"""
+
+        # Cells without code are found in the grid dict without evaluation
+        if key not in self.data_array.dict_grid:
+            return True
+
+        res = self.data_array[key]
+
+        return res is None or res == ""
 
     def _get_available_space_rects(self, dc, grid, key, rect, text_pos,
-                                   text_extent, res_text):
+                                   text_extent, res_text, corners=None):
         """Returns rects needed by key cell that are in available space"""
 
         yield rect
 
-        for cell in self._get_empty_cells(dc, grid, key,
-                                          text_pos, text_extent):
+        for cell in self._get_empty_cells(dc, grid, key, text_pos,
+                                          text_extent, corners=corners):
             __row, __col, _ = cell
             cell_rect = grid.CellToRect(__row, __col)
 
             yield cell_rect
 
-    def draw_text_label(self, dc, res, rect, grid, key):
-        """Draws text label of cell
+    def get_result_text(self, res):
+        """Returns unicode text of cell result res
 
         Text is truncated at config["max_result_length"]
 
@@ -218,13 +367,30 @@ class GridRenderer(wx.grid.PyGridCellRenderer):
         result_length = config["max_result_length"]
 
         try:
-            res_text = unicode(res)[:result_length]
+            return unicode(res)[:result_length]
 
         except UnicodeDecodeError:
-            res_text = unicode(res, encoding="utf-8")[:result_length]
+            return unicode(res, encoding="utf-8")[:result_length]
+
+    def draw_text_label(self, dc, res, rect, grid, key, overflow=True):
+        """Draws text label of cell
+
+        Text is truncated at config["max_result_length"]
+
+        Parameters
+        ----------
+
+        overflow: Bool, defaults to True
+        \tIf False then text that exceeds the cell rect is not drawn
+
+        Returns False if the text has not been drawn because of overflow.
+
+        """
+
+        res_text = self.get_result_text(res)
 
         if not res_text:
-            return
+            return True
 
         row, col, tab = key
 
@@ -251,17 +417,21 @@ class GridRenderer(wx.grid.PyGridCellRenderer):
 
         # Get font from font attribute strings
 
-        font = self.get_font(textfont, pointsize, fontweight, fontstyle,
-                             underline)
-        font.SetFaceName(textfont)  # Windows hack
+        font_key = textfont, pointsize, fontweight, fontstyle, underline
+
+        font = self.get_font(*font_key)
         dc.SetFont(font)
 
-        text_x, text_y = self.get_text_position(dc, rect, res_text, angle,
-                                                vertical_align, justification)
+        text_extent, (text_x, text_y), clipping, corners = \
+            self.get_text_layout(dc, rect, res_text, font_key, angle,
+                                 vertical_align, justification)
 
-        __rect = xrect.Rect(rect.x, rect.y, rect.width, rect.height)
+        if clipping and not overflow:
+            return False
 
-        text_extent = dc.GetTextExtent(res_text)
+        # The layout position is relative to the cell rect
+        text_x += rect.x
+        text_y += rect.y
 
         dc.SetBackgroundMode(wx.TRANSPARENT)
         dc.SetTextForeground(textcolor)
@@ -270,31 +440,105 @@ class GridRenderer(wx.grid.PyGridCellRenderer):
 
         text_pos = text_x, text_y, angle
 
-        if all(__rect.is_point_in_rect(*textedge) for textedge in
-               self.get_textbox_edges(text_pos, text_extent)):
-            clipping = False
-        else:
-            clipping = True
+        if clipping:
+            # The layout corners are relative to the cell rect
+            corners = corners + (rect.x, rect.y)
+
             clip_rects = \
                 self._get_available_space_rects(dc, grid, key, rect, text_pos,
-                                                text_extent, res_text)
+                                                text_extent, res_text,
+                                                corners=corners)
 
-        if clipping:
             for clip_rect in clip_rects:
                 dc.SetClippingRect(clip_rect)
                 dc.DrawRotatedText(res_text, *text_pos)
-                text_extent = dc.GetTextExtent(res_text)
                 if strikethrough:
                     self._draw_strikethrough_line(grid, dc, rect, text_x,
                                                   text_y, angle, text_extent)
                 dc.DestroyClippingRegion()
         else:
             dc.DrawRotatedText(res_text, *text_pos)
-            text_extent = dc.GetTextExtent(res_text)
             if strikethrough:
                 self._draw_strikethrough_line(grid, dc, rect, text_x, text_y,
                                               angle, text_extent)
 
+        return True
+
+    @staticmethod
+    def _get_bitmap_pair_size(source_bitmap_pair):
+        """Returns number of bitmap pixels of (source, bitmap) cache value"""
+
+        __, bmp = source_bitmap_pair
+
+        return bmp.GetWidth() * bmp.GetHeight()
+
+    @staticmethod
+    def _get_tile_size(tile):
+        """Returns number of pixels of tile for the tile cache"""
+
+        if tile is None:
+            return 0
+
+        return tile.GetWidth() * tile.GetHeight()
+
+    def get_text_tile(self, grid, res, rect, key, bg_key, bg):
+        """Returns bitmap of rendered text cell or None
+
+        None is returned if the text overflows the cell rect.
+        Tiles are cached by content, i. e. by text, background key and text
+        attributes. Therefore, cell edits and attribute changes do not
+        require explicit invalidation.
+
+        Parameters
+        ----------
+
+        res: Object
+        \tCell result, which is drawn as text
+        bg_key: Tuple
+        \tKey of background bg in the background cache
+        bg: Background
+        \tCell background
+
+        """
+
+        row, col, __ = key
+
+        cell_attributes = self.data_array.cell_attributes[key]
+
+        tile_key = (self.get_result_text(res), row == 0, col == 0, bg_key) + \
+            tuple(cell_attributes[attr] for attr in self.tile_attributes)
+
+        try:
+            return self.tiles[tile_key]
+
+        except KeyError:
+            pass
+
+        width, height = rect.width, rect.height
+
+        tile_dc = self.tile_dc
+        tile_bmp = wx.EmptyBitmap(width, height)
+        tile_dc.SelectObject(tile_bmp)
+
+        try:
+            tile_dc.Blit(0, 0, width, height, bg.dc, 0, 0)
+
+            tile_rect = wx.Rect(0, 0, width, height)
+
+            if self.draw_text_label(tile_dc, res, tile_rect, grid, key,
+                                    overflow=False):
+                tile = tile_bmp
+
+            else:
+                tile = None
+
+        finally:
+            tile_dc.SelectObject(wx.NullBitmap)
+
+        self.tiles[tile_key] = tile
+
+        return tile
+
     def _draw_strikethrough_line(self, grid, dc, rect,
                                  string_x, string_y, angle, text_extent):
         """Draws a strikethrough line"""
@@ -347,18 +591,94 @@ class GridRenderer(wx.grid.PyGridCellRenderer):
         underlined: Bool
         \tFont is underlined if True
 
+        Fonts are cached. Therefore, the returned font must not be altered.
+
         """
 
+        zoomed_pointsize = self.get_zoomed_size(pointsize)
+
+        font_key = textfont, zoomed_pointsize, fontweight, fontstyle, \
+            underline
+
+        try:
+            return self.fonts[font_key]
+
+        except KeyError:
+            pass
+
         # Get a real font from textfont string
 
         font = get_font_from_data(textfont)
-        font.SetPointSize(self.get_zoomed_size(pointsize))
+        font.SetPointSize(zoomed_pointsize)
         font.SetWeight(fontweight)
         font.SetStyle(fontstyle)
         font.SetUnderlined(underline)
+        font.SetFaceName(textfont)  # Windows hack
+
+        self.fonts[font_key] = font
 
         return font
 
+    def get_text_layout(self, dc, rect, res_text, font_key, angle,
+                        vertical_align, justification):
+        """Returns text extent, position, clipping flag and text box corners
+
+        The text position and the corners of the rotated text box are
+        relative to the top left corner of rect. The clipping flag is True
+        if the text exceeds rect. Corners are only computed for clipping
+        text, which is tested for collisions with neighboring cells.
+        Otherwise, they are None.
+        Layouts are cached. The font for font_key must be set in dc.
+
+        Parameters
+        ----------
+
+        rect: wx.Rect
+        \tCell rect
+        res_text: Unicode
+        \tText to be drawn
+        font_key: Tuple
+        \tArguments of get_font for the font of the text
+
+        """
+
+        # Text extents depend on the device, e. g. screen or printer
+        dc_key = dc.__class__, tuple(dc.GetPPI()), tuple(dc.GetUserScale())
+
+        layout_key = res_text, font_key, angle, vertical_align, \
+            justification, rect.width, rect.height, dc_key
+
+        try:
+            return self.layouts[layout_key]
+
+        except KeyError:
+            pass
+
+        origin_rect = wx.Rect(0, 0, rect.width, rect.height)
+
+        text_extent = dc.GetTextExtent(res_text)
+        text_x, text_y = self.get_text_position(dc, origin_rect, res_text,
+                                                angle, vertical_align,
+                                                justification)
+
+        __rect = xrect.Rect(0, 0, rect.width, rect.height)
+        text_edges = self.get_textbox_edges((text_x, text_y, angle),
+                                            text_extent)
+
+        clipping = not all(__rect.is_point_in_rect(*textedge)
+                           for textedge in text_edges)
+
+        if clipping:
+            corners = self.get_text_rotorect((text_x, text_y, angle),
+                                             text_extent).get_corners()
+        else:
+            corners = None
+
+        layout = text_extent, (text_x, text_y), clipping, corners
+        self.layouts[layout_key] = layout
+
+        return layout
+
     def get_text_position(self, dc, rect, res_text, angle,
                           vertical_align, justification):
         """Returns text x, y position in cell"""
@@ -515,30 +835,134 @@ class GridRenderer(wx.grid.PyGridCellRenderer):
 
                 return rect
 
-    def draw_bitmap(self, dc, bmp, rect, grid, key, scale=True):
-        """Draws wx.Bitmap bmp on cell
+    def get_scaled_bitmap(self, bmp, width, height):
+        """Returns a scaled version of the bitmap bmp
 
-        The bitmap is scaled to match the cell rect
+        Scaled bitmaps are cached for each source bitmap and target size.
+        While the grid is scrolled, bitmaps that are not cached in high
+        quality are scaled in normal quality and draft_drawn is set.
 
         """
 
-        def scale(bmp, width, height):
-            """Returns a scaled version of the bitmap bmp"""
+        hq_key = id(bmp), width, height, wx.IMAGE_QUALITY_HIGH
+
+        try:
+            # Cached values keep a reference to the source bitmap so that
+            # its id cannot be reused while the scaled bitmap is cached
+            __, scaled_bmp = self.scaled_bitmaps[hq_key]
+            return scaled_bmp
+
+        except KeyError:
+            pass
+
+        if self.scrolling:
+            quality = wx.IMAGE_QUALITY_NORMAL
+            self.draft_drawn = True
 
+        else:
+            quality = wx.IMAGE_QUALITY_HIGH
+
+        scaled_key = id(bmp), width, height, quality
+
+        try:
+            __, scaled_bmp = self.scaled_bitmaps[scaled_key]
+
+        except KeyError:
             img = bmp.ConvertToImage()
-            img = img.Scale(width, height, quality=wx.IMAGE_QUALITY_HIGH)
-            return wx.BitmapFromImage(img)
+            img = img.Scale(width, height, quality=quality)
+            scaled_bmp = wx.BitmapFromImage(img)
+
+            self.scaled_bitmaps[scaled_key] = bmp, scaled_bmp
+
+        return scaled_bmp
+
+    def draw_bitmap(self, dc, bmp, rect, grid, key, scale=True):
+        """Draws wx.Bitmap bmp on cell
+
+        The bitmap is scaled to match the cell rect
+
+        """
 
         if scale:
-            bmp = scale(bmp, rect.width, rect.height)
+            bmp = self.get_scaled_bitmap(bmp, rect.width, rect.height)
 
         dc.DrawBitmap(bmp, rect.x, rect.y)
 
-    def draw_matplotlib_figure(self, dc, figure, rect, grid, key):
+    def _render_chart(self, key, chart_key, figure, width, height, dpi,
+                      zoom):
+        """Returns RGBA data of rendered figure, runs in chart worker thread
+
+        None is returned if the render request is outdated, i. e. if the
+        cell has been resized or zoomed in the meantime, or if rendering
+        fails.
+
+        """
+
+        if self.pending_charts.get(key) != chart_key:
+            return
+
+        try:
+            return fig2rgba(figure, width, height, dpi, zoom)
+
+        except Exception:
+            return
+
+    def _on_chart_rendered(self, grid, key, chart_key, figure, rgba):
+        """Caches rendered chart bitmap and refreshes its cell
+
+        Runs in the main thread after a chart render has finished.
+
+        """
+
+        if self.pending_charts.get(key) != chart_key:
+            # Outdated render
+            return
+
+        del self.pending_charts[key]
+
+        if rgba is None:
+            return
+
+        self.charts[chart_key] = figure, wx.BitmapFromBufferRGBA(*rgba)
+
+        row, col, tab = key
+
+        try:
+            if tab != grid.current_table:
+                return
+
+            rect = self.get_merged_rect(grid, key, grid.CellToRect(row, col))
+            x, y = grid.CalcScrolledPosition(rect.x, rect.y)
+            grid.GetGridWindow().RefreshRect(
+                wx.Rect(x, y, rect.width, rect.height), eraseBackground=False)
+
+        except wx.PyDeadObjectError:
+            # The grid does not exist any more
+            pass
+
+    def _draw_chart_placeholder(self, dc, rect):
+        """Draws placeholder text for a chart that is being rendered"""
+
+        dc.SetFont(self.get_font(config["font"], 10, wx.NORMAL, wx.ITALIC,
+                                 False))
+        dc.SetBackgroundMode(wx.TRANSPARENT)
+        dc.SetTextForeground(wx.Colour(*config["grid_color"]))
+
+        dc.SetClippingRect(rect)
+        dc.DrawText(_("Rendering chart..."), rect.x + 2, rect.y + 2)
+        dc.DestroyClippingRegion()
+
+    def draw_matplotlib_figure(self, dc, figure, rect, grid, key,
+                               background=True):
         """Draws a matplotlib.pyplot.Figure on cell
 
         The figure is converted into a wx.Bitmap,
         which is then drawn by draw_bitmap.
+        Bitmaps are cached for each figure, cell size, dpi and zoom.
+
+        If background is True then uncached figures are rendered in a
+        worker thread. A placeholder is drawn until the bitmap is ready.
+        Then the cell is refreshed.
 
         """
 
@@ -547,10 +971,63 @@ class GridRenderer(wx.grid.PyGridCellRenderer):
         width, height = crop_rect.width, crop_rect.height
         dpi = float(wx.ScreenDC().GetPPI()[0])
 
-        bmp = fig2bmp(figure, width, height, dpi, self.zoom)
+        # The cached value keeps a reference to the figure so that the
+        # figure id cannot be reused while the bitmap is cached
+        chart_key = id(figure), width, height, dpi, self.zoom
+
+        try:
+            __, bmp = self.charts[chart_key]
+
+        except KeyError:
+            if background:
+                if self.pending_charts.get(key) != chart_key:
+                    # New render request. Older requests become outdated.
+                    self.pending_charts[key] = chart_key
+
+                    def callback(rgba):
+                        wx.CallAfter(self._on_chart_rendered, grid, key,
+                                     chart_key, figure, rgba)
+
+                    self.chart_pool.apply_async(
+                        self._render_chart,
+                        (key, chart_key, figure, width, height, dpi,
+                         self.zoom),
+                        callback=callback)
+
+                self._draw_chart_placeholder(dc, crop_rect)
+
+                return
+
+            bmp = fig2bmp(figure, width, height, dpi, self.zoom)
+            self.charts[chart_key] = figure, bmp
 
         self.draw_bitmap(dc, bmp, crop_rect, grid, key, scale=False)
 
+    def _draw_result(self, dc, res, rect, grid, attr, key, printing=False):
+        """Draws cell result res on top of the cell background"""
+
+        # Check if the dc is drawn manually be a return func
+
+        if isinstance(res, types.FunctionType):
+            # Add func_dict attribute
+            # so that we are sure that it uses a dc
+            try:
+                res(grid, attr, dc, rect)
+            except TypeError:
+                pass
+
+        elif isinstance(res, wx._gdi.Bitmap):
+            # A bitmap is returned --> Draw it!
+            self.draw_bitmap(dc, res, rect, grid, key)
+
+        elif isinstance(res, matplotlib.pyplot.Figure):
+            # A matplotlib figure is returned --> Draw it!
+            self.draw_matplotlib_figure(dc, res, rect, grid, key,
+                                        background=not printing)
+
+        elif res is not None:
+            self.draw_text_label(dc, res, rect, grid, key)
+
     def Draw(self, grid, attr, dc, rect, row, col, isSelected, printing=False):
         """Draws the cell border and content"""
 
@@ -582,15 +1059,12 @@ class GridRenderer(wx.grid.PyGridCellRenderer):
                            [self.data_array.cell_attributes[key][bgc]
                                for bgc in bg_components])
 
+            self._validate_caches()
+
             try:
                 bg = self.backgrounds[bg_key]
 
             except KeyError:
-                if len(self.backgrounds) > 10000:
-                    # self.backgrounds may grow quickly
-
-                    self.backgrounds = {}
-
                 bg = self.backgrounds[bg_key] = \
                     Background(grid, rect, self.data_array, *key)
 
@@ -599,30 +1073,34 @@ class GridRenderer(wx.grid.PyGridCellRenderer):
         else:
             mask_type = wx.COPY
 
-        dc.Blit(rect.x, rect.y, rect.width, rect.height,
-                bg.dc, 0, 0, mask_type)
-
-        # Check if the dc is drawn manually be a return func
         res = self.data_array[row, col, grid.current_table]
 
-        if isinstance(res, types.FunctionType):
-            # Add func_dict attribute
-            # so that we are sure that it uses a dc
-            try:
-                res(grid, attr, dc, rect)
-            except TypeError:
-                pass
+        # Text cells that are not selected are drawn from the tile cache
 
-        elif isinstance(res, wx._gdi.Bitmap):
-            # A bitmap is returned --> Draw it!
-            self.draw_bitmap(dc, res, rect, grid, key)
+        is_text = res is not None and \
+            not isinstance(res, (types.FunctionType, wx._gdi.Bitmap,
+                                 matplotlib.pyplot.Figure))
 
-        elif isinstance(res, matplotlib.pyplot.Figure):
-            # A matplotlib figure is returned --> Draw it!
-            self.draw_matplotlib_figure(dc, res, rect, grid, key)
+        if is_text and not isSelected and not printing:
+            tile = self.get_text_tile(grid, res, rect, key, bg_key, bg)
 
-        elif res is not None:
-            self.draw_text_label(dc, res, rect, grid, key)
+        else:
+            tile = None
+
+        if tile is not None:
+            # The tile contains background and text
+            tile_dc = self.tile_dc
+            tile_dc.SelectObject(tile)
+            dc.Blit(rect.x, rect.y, rect.width, rect.height,
+                    tile_dc, 0, 0, mask_type)
+            tile_dc.SelectObject(wx.NullBitmap)
+
+        else:
+            dc.Blit(rect.x, rect.y, rect.width, rect.height,
+                    bg.dc, 0, 0, mask_type)
+
+            self._draw_result(dc, res, rect, grid, attr, key,
+                              printing=printing)
 
         if grid.actions.cursor[:2] == (row, col):
             self.update_cursor(dc, grid, row, col)
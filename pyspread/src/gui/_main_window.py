@@ -46,6 +46,7 @@ from _toolbars import MainToolbar, MacroToolbar, FindToolbar, AttributesToolbar
 from _widgets import EntryLineToolbarPanel, StatusBar
 
 from src.lib.clipboard import Clipboard
+from src.lib.__csv import TxtGenerator
 
 from _gui_interfaces import GuiInterfaces
 from src.gui.icons import icons
@@ -742,7 +743,11 @@ class MainWindowEventHandlers(EventMixin):
         grid = self.main_window.grid
         tl_cell = grid.GetGridCursorRow(), grid.GetGridCursorCol()
 
-        grid.actions.paste(tl_cell, import_data)
+        if isinstance(import_data, TxtGenerator):
+            # Whitespace separated text files have a dedicated fast path
+            grid.actions.import_txt(tl_cell, import_data)
+        else:
+            grid.actions.paste(tl_cell, import_data)
 
         self.main_window.grid.ForceRefresh()
 
@@ -921,8 +926,12 @@ class MainWindowEventHandlers(EventMixin):
         selection = self.main_window.grid.selection
         data = self.main_window.actions.copy_result(selection)
 
+        if data is None:
+            # Copy has been aborted
+            pass
+
         # Check if result is a bitmap
-        if type(data) is wx._gdi.Bitmap:
+        elif type(data) is wx._gdi.Bitmap:
             # Copy bitmap to clipboard
             self.main_window.clipboard.set_clipboard(data, datatype="bitmap")
 
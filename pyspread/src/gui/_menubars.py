@@ -286,7 +286,10 @@ class MainMenu(_filledMenu, EventMixin):
                 [item, [self.RefreshSelectionMsg,
                         _("Refresh selected cells") + "\tF5",
                         _("Refresh selected cells even when frozen"),
-                        wx.ID_REFRESH]]]],
+                        wx.ID_REFRESH]],
+                [item, [self.RefreshFrozenMsg,
+                        _("Refresh frozen cells") + "\tShift+F5",
+                        _("Refresh all frozen cells")]]]],
             [wx.Menu, _("F&ormat"), [
                 [item, [self.FontDialogMsg, _("Font..."),
                         _("Launch font dialog.")]],
@@ -424,10 +424,34 @@ class CsvInterface(StatusBarEventMixin):
 
 
 class TxtGenerator(StatusBarEventMixin):
-    """Generator of generators of Whitespace separated txt file cell content"""
+    """Generator of generators of Whitespace separated txt file cell content
 
-    def __init__(self, main_window, path):
+    The file is read in blocks of block_size bytes. If shape is given then
+    rows and columns beyond shape are not tokenized. In this case, the
+    attributes row_overflow and col_overflow are True after iteration if
+    the file content has been truncated.
+
+    Parameters
+    ----------
+    main_window: wx.Frame
+    \tMain window for status bar messages
+    path: String
+    \tPath of txt file
+    shape: 2-tuple of Integer, defaults to None
+    \tMaximum number of rows and columns that are yielded, unlimited if None
+    block_size: Integer, defaults to 1048576
+    \tApproximate number of bytes that are read from the file at once
+
+    """
+
+    def __init__(self, main_window, path, shape=None, block_size=1048576):
         self.main_window = main_window
+        self.shape = shape
+        self.block_size = block_size
+
+        self.row_overflow = False
+        self.col_overflow = False
+
         try:
             self.infile = open(path)
 
@@ -437,13 +461,59 @@ class TxtGenerator(StatusBarEventMixin):
                                text=statustext)
             self.infile = None
 
+    def _split_lines(self, lines):
+        """Generator of lists of whitespace separated tokens in lines"""
+
+        if self.shape is None:
+            for line in lines:
+                yield line.split()
+
+        else:
+            max_cols = self.shape[1]
+
+            for line in lines:
+                # The remainder of the line is not tokenized
+                tokens = line.split(None, max_cols)
+
+                if len(tokens) > max_cols:
+                    self.col_overflow = True
+                    tokens.pop()
+
+                yield tokens
+
     def __iter__(self):
 
         # If self.infile is None then stopiteration is reached immediately
         if self.infile is None:
             return
 
-        for line in self.infile:
-            yield (col for col in line.split())
+        if self.shape is None:
+            max_rows = None
+        else:
+            max_rows = self.shape[0]
+
+        self.row_overflow = self.col_overflow = False
+
+        no_rows = 0
+
+        try:
+            while True:
+                lines = self.infile.readlines(self.block_size)
+
+                if not lines:
+                    break
+
+                if max_rows is not None and no_rows + len(lines) > max_rows:
+                    self.row_overflow = True
+                    lines = lines[:max_rows - no_rows]
+
+                no_rows += len(lines)
 
-        self.infile.close()
+                for tokens in self._split_lines(lines):
+                    yield tokens
+
+                if self.row_overflow:
+                    break
+
+        finally:
+            self.infile.close()
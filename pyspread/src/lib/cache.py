@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright Martin Manns
+# Distributed under the terms of the GNU General Public License
+
+# --------------------------------------------------------------------
+# pyspread is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyspread is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyspread.  If not, see <http://www.gnu.org/licenses/>.
+# --------------------------------------------------------------------
+
+"""
+
+Cache
+=====
+
+cache.py contains a size bounded least recently used (LRU) cache.
+
+"""
+
+from collections import OrderedDict
+import sys
+import threading
+
+
+def get_object_size(obj):
+    """Returns estimated memory size of obj in bytes
+
+    Objects with an nbytes attribute such as numpy arrays are estimated
+    by their data size. Other objects are estimated via sys.getsizeof,
+    which does not include the size of referenced objects.
+
+    """
+
+    try:
+        nbytes = obj.nbytes
+
+    except Exception:
+        nbytes = None
+
+    if isinstance(nbytes, (int, long)):
+        # Depending on the numpy version, getsizeof includes array data
+        return max(sys.getsizeof(obj, 0), nbytes)
+
+    return sys.getsizeof(obj, 0)
+
+
+class LRUCache(object):
+    """Dict like cache that evicts least recently used items
+
+    The cache is bounded by the total size of its items. Item sizes are
+    provided by the function get_size. Reads and writes are counted as
+    hits and misses, removals due to the size bound as evictions.
+    Access is guarded by a lock so that the cache may be shared with
+    worker threads.
+
+    Parameters
+    ----------
+
+    max_size: Integer
+    \tMaximum total size of all items in the cache
+    get_size: Function, defaults to 1 for each item
+    \tReturns the size of a value that is stored in the cache
+
+    """
+
+    def __init__(self, max_size, get_size=None):
+        self.max_size = max_size
+
+        if get_size is None:
+            self.get_size = lambda value: 1
+        else:
+            self.get_size = get_size
+
+        # Maps key to (value, size), oldest item first
+        self._data = OrderedDict()
+
+        self._lock = threading.RLock()
+
+        self.size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        """Membership test, which does not change item order or stats"""
+
+        return key in self._data
+
+    def __getitem__(self, key):
+        """Returns value for key and marks it as most recently used"""
+
+        self._lock.acquire()
+
+        try:
+            try:
+                value, size = self._data.pop(key)
+
+            except KeyError:
+                self.misses += 1
+                raise
+
+            self._data[key] = value, size
+            self.hits += 1
+
+            return value
+
+        finally:
+            self._lock.release()
+
+    def __setitem__(self, key, value):
+        """Stores value and evicts least recently used items if required
+
+        Values that are larger than max_size are not stored.
+
+        """
+
+        size = self.get_size(value)
+
+        self._lock.acquire()
+
+        try:
+            self.pop(key)
+
+            if size > self.max_size:
+                return
+
+            while self._data and self.size + size > self.max_size:
+                __, (__, old_size) = self._data.popitem(last=False)
+                self.size -= old_size
+                self.evictions += 1
+
+            self._data[key] = value, size
+            self.size += size
+
+        finally:
+            self._lock.release()
+
+    def keys(self):
+        """Returns list of keys, least recently used key first"""
+
+        self._lock.acquire()
+
+        try:
+            return self._data.keys()
+
+        finally:
+            self._lock.release()
+
+    def get(self, key, default=None):
+        """Returns value for key if key is cached else default"""
+
+        try:
+            return self[key]
+
+        except KeyError:
+            return default
+
+    def pop(self, key, default=None):
+        """Removes key from cache and returns its value or default"""
+
+        self._lock.acquire()
+
+        try:
+            try:
+                value, size = self._data.pop(key)
+
+            except KeyError:
+                return default
+
+            self.size -= size
+
+            return value
+
+        finally:
+            self._lock.release()
+
+    def clear(self):
+        """Removes all items from the cache. Statistics are kept."""
+
+        self._lock.acquire()
+
+        try:
+            self._data.clear()
+            self.size = 0
+
+        finally:
+            self._lock.release()
+
+    def get_stats(self):
+        """Returns dict with cache statistics"""
+
+        self._lock.acquire()
+
+        try:
+            return {
+                "items": len(self._data),
+                "size": self.size,
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+        finally:
+            self._lock.release()
+
+# End of class LRUCache
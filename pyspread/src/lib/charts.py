@@ -29,6 +29,8 @@ Provides
 --------
 
 * object2code: Returns code for widget from dict object
+* get_figure_lock: Returns lock for drawing a matplotlib figure
+* fig2rgba: Returns RGBA data from matplotlib chart
 * fig2bmp: Returns wx.Bitmap from matplotlib chart
 * ChartFigure: Main chart class
 
@@ -38,6 +40,10 @@ from copy import copy
 from cStringIO import StringIO
 import datetime
 import i18n
+import threading
+from weakref import WeakKeyDictionary
+
+import numpy
 
 import wx
 
@@ -67,8 +73,33 @@ def object2code(key, code):
     return code
 
 
-def fig2bmp(figure, width, height, dpi, zoom):
-    """Returns wx.Bitmap from matplotlib chart
+# Locks for drawing figures, see get_figure_lock
+_figure_locks = WeakKeyDictionary()
+_figure_locks_lock = threading.Lock()
+
+
+def get_figure_lock(figure):
+    """Returns lock that has to be held while figure is drawn
+
+    Figures may be drawn in the chart worker thread of the grid renderer
+    and in the main thread at the same time, e. g. when printing.
+
+    """
+
+    _figure_locks_lock.acquire()
+
+    try:
+        return _figure_locks.setdefault(figure, threading.RLock())
+
+    finally:
+        _figure_locks_lock.release()
+
+
+def fig2rgba(figure, width, height, dpi, zoom):
+    """Returns width, height and RGBA data string of rendered matplotlib chart
+
+    Only the Agg backend is used, so that this function can be run in a
+    worker thread. The figure lock is held while the figure is drawn.
 
     Parameters
     ----------
@@ -85,19 +116,52 @@ def fig2bmp(figure, width, height, dpi, zoom):
 
     dpi *= float(zoom)
 
-    figure.set_figwidth(width / dpi)
-    figure.set_figheight(height / dpi)
-    figure.subplots_adjust()
+    figure_lock = get_figure_lock(figure)
+    figure_lock.acquire()
+
+    try:
+        figure.set_dpi(dpi)
+        figure.set_figwidth(width / dpi)
+        figure.set_figheight(height / dpi)
+        figure.subplots_adjust()
 
-    figure.set_canvas(FigureCanvas(figure))
-    png_stream = StringIO()
+        canvas = FigureCanvas(figure)
+        figure.set_canvas(canvas)
 
-    figure.savefig(png_stream, format='png', dpi=(dpi))
+        canvas.draw()
 
-    png_stream.seek(0)
-    img = wx.ImageFromStream(png_stream, type=wx.BITMAP_TYPE_PNG)
+        bmp_width, bmp_height = canvas.get_width_height()
 
-    return wx.BitmapFromImage(img)
+        # Copy the buffer because the canvas may be redrawn later
+        rgba = numpy.frombuffer(canvas.buffer_rgba(), dtype=numpy.uint8)
+        rgba_string = rgba.tostring()
+
+    finally:
+        figure_lock.release()
+
+    return bmp_width, bmp_height, rgba_string
+
+
+def fig2bmp(figure, width, height, dpi, zoom):
+    """Returns wx.Bitmap from matplotlib chart
+
+    Parameters
+    ----------
+    fig: Object
+    \tMatplotlib figure
+    width: Integer
+    \tImage width in pixels
+    height: Integer
+    \tImage height in pixels
+    dpi = Float
+    \tDC resolution
+
+    The figure is rendered by the Agg backend. Its RGBA buffer is
+    converted into the bitmap directly without image file encoding.
+
+    """
+
+    return wx.BitmapFromBufferRGBA(*fig2rgba(figure, width, height, dpi, zoom))
 
 
 def fig2x(figure, format):
@@ -105,7 +169,15 @@ def fig2x(figure, format):
 
     # Save svg to file like object svg_io
     io = StringIO()
-    figure.savefig(io, format=format)
+
+    figure_lock = get_figure_lock(figure)
+    figure_lock.acquire()
+
+    try:
+        figure.savefig(io, format=format)
+
+    finally:
+        figure_lock.release()
 
     # Rewind the file like object
     io.seek(0)
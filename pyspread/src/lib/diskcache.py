@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright Martin Manns
+# Distributed under the terms of the GNU General Public License
+
+# --------------------------------------------------------------------
+# pyspread is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyspread is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyspread.  If not, see <http://www.gnu.org/licenses/>.
+# --------------------------------------------------------------------
+
+"""
+
+Diskcache
+=========
+
+diskcache.py contains a size bounded cache that stores pickled values
+in files of a local cache directory.
+
+"""
+
+import cPickle
+import hashlib
+import os
+
+
+def get_digest(*objects):
+    """Returns hex digest of the pickled objects
+
+    Raises an exception if an object cannot be pickled.
+
+    """
+
+    return hashlib.sha1(cPickle.dumps(objects,
+                                      cPickle.HIGHEST_PROTOCOL)).hexdigest()
+
+
+class DiskCache(object):
+    """Cache that stores values in files, which are named after digests
+
+    The cache is bounded by the total size of its files. When it is
+    exceeded, least recently used files are removed. File access times
+    are tracked via file modification times so that the cache may be
+    shared between sessions.
+
+    Parameters
+    ----------
+
+    path: String
+    \tCache directory, which is created on the first write
+    max_size: Integer
+    \tMaximum total size of all cache files in bytes
+
+    """
+
+    def __init__(self, path, max_size):
+        self.path = path
+        self.max_size = max_size
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _get_filepath(self, digest):
+        """Returns path of the cache file for digest"""
+
+        return os.path.join(self.path, digest)
+
+    def __contains__(self, digest):
+        return os.path.isfile(self._get_filepath(digest))
+
+    def __getitem__(self, digest):
+        """Returns value for digest and marks it as most recently used
+
+        Raises KeyError if there is no readable cache file for digest.
+
+        """
+
+        filepath = self._get_filepath(digest)
+
+        try:
+            infile = open(filepath, "rb")
+
+            try:
+                value = cPickle.load(infile)
+            finally:
+                infile.close()
+
+        except Exception:
+            self.misses += 1
+            raise KeyError(digest)
+
+        try:
+            os.utime(filepath, None)
+
+        except OSError:
+            pass
+
+        self.hits += 1
+
+        return value
+
+    def __setitem__(self, digest, value):
+        """Stores value and evicts least recently used files if required
+
+        Values that are larger than max_size are not stored.
+        Raises an exception if value cannot be pickled.
+
+        """
+
+        data = cPickle.dumps(value, cPickle.HIGHEST_PROTOCOL)
+
+        if len(data) > self.max_size:
+            return
+
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path)
+
+        filepath = self._get_filepath(digest)
+
+        # Write to a temporary file first so that readers never see
+        # incomplete cache files
+        tmp_filepath = filepath + ".tmp"
+
+        outfile = open(tmp_filepath, "wb")
+
+        try:
+            outfile.write(data)
+        finally:
+            outfile.close()
+
+        if os.path.exists(filepath):
+            os.remove(filepath)
+
+        os.rename(tmp_filepath, filepath)
+
+        self._evict(keep=filepath)
+
+    def get(self, digest, default=None):
+        """Returns value for digest if digest is cached else default"""
+
+        try:
+            return self[digest]
+
+        except KeyError:
+            return default
+
+    def _get_files(self):
+        """Returns list of (mtime, size, filepath) of all cache files"""
+
+        files = []
+
+        if not os.path.isdir(self.path):
+            return files
+
+        for filename in os.listdir(self.path):
+            if filename.endswith(".tmp"):
+                continue
+
+            filepath = os.path.join(self.path, filename)
+
+            try:
+                stat = os.stat(filepath)
+
+            except OSError:
+                # File has been removed in the meantime
+                continue
+
+            files.append((stat.st_mtime, stat.st_size, filepath))
+
+        return files
+
+    def _evict(self, keep=None):
+        """Removes least recently used files until max_size is met
+
+        Parameters
+        ----------
+
+        keep: String, defaults to None
+        \tPath of file that is not removed, e. g. the file just written
+
+        """
+
+        files = self._get_files()
+        size = sum(file_size for __, file_size, __ in files)
+
+        for __, file_size, filepath in sorted(files):
+            if size <= self.max_size:
+                break
+
+            if filepath == keep:
+                continue
+
+            try:
+                os.remove(filepath)
+
+            except OSError:
+                continue
+
+            size -= file_size
+            self.evictions += 1
+
+    def clear(self):
+        """Removes all cache files. Statistics are kept."""
+
+        for __, __, filepath in self._get_files():
+            try:
+                os.remove(filepath)
+
+            except OSError:
+                pass
+
+    def get_stats(self):
+        """Returns dict with cache statistics"""
+
+        files = self._get_files()
+
+        return {
+            "items": len(files),
+            "size": sum(file_size for __, file_size, __ in files),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+# End of class DiskCache
@@ -29,6 +29,8 @@ Provides
 
  * get_font_from_data
  * get_pen_from_data
+ * get_bitmap_from_data
+ * get_bitmap_from_code
  * color2code
  * code2color
  * parse_dict_strings
@@ -36,11 +38,40 @@ Provides
 """
 
 import ast
+import base64
+import bz2
+import hashlib
+import re
 
 import wx
 
+from src.config import config
+from src.lib.cache import LRUCache
 from src.sysvars import get_default_font
 
+# Decoded bitmaps, keyed by width, height and hash of the encoded data.
+# The cache is created on first use so that user preferences are loaded.
+bitmap_cache = None
+
+
+def get_bitmap_cache():
+    """Returns cache of decoded bitmaps, measured in bitmap pixels"""
+
+    global bitmap_cache
+
+    if bitmap_cache is None:
+        bitmap_cache = LRUCache(
+            config["max_decoded_bitmap_cache_pixels"],
+            get_size=lambda bmp: bmp.GetWidth() * bmp.GetHeight())
+
+    return bitmap_cache
+
+
+# Code of bitmaps that are pasted into cells, see bmp2code
+bitmap_code_regex = re.compile(
+    r"wx\.BitmapFromImage\(wx\.ImageFromData\((\d+), (\d+), "
+    r"bz2\.decompress\(base64\.b64decode\('([A-Za-z0-9+/=]*)'\)\)\)\)\Z")
+
 
 def get_font_from_data(fontdata):
     """Returns wx.Font from fontdata string"""
@@ -66,6 +97,70 @@ def get_pen_from_data(pendata):
     return pen
 
 
+def get_bitmap_from_data(width, height, data):
+    """Returns wx.Bitmap from base64 encoded, bz2 compressed RGB data
+
+    Decoded bitmaps are cached by content hash independently of the result
+    cache. Therefore, the returned bitmap must not be altered.
+
+    Parameters
+    ----------
+
+    width: Integer
+    \tBitmap width in pixels
+    height: Integer
+    \tBitmap height in pixels
+    data: String
+    \tbase64 encoded, bz2 compressed RGB data
+
+    """
+
+    bitmap_cache = get_bitmap_cache()
+
+    bitmap_key = width, height, hashlib.sha1(data).digest()
+
+    try:
+        return bitmap_cache[bitmap_key]
+
+    except KeyError:
+        pass
+
+    rgb_data = bz2.decompress(base64.b64decode(data))
+    bmp = wx.BitmapFromImage(wx.ImageFromData(width, height, rgb_data))
+
+    bitmap_cache[bitmap_key] = bmp
+
+    return bmp
+
+
+def get_bitmap_from_code(code):
+    """Returns wx.Bitmap for code of a pasted bitmap, else None
+
+    Code of pasted bitmaps is not evaluated. The bitmap is decoded via
+    get_bitmap_from_data so that it is cached.
+
+    Parameters
+    ----------
+
+    code: String
+    \tCell code
+
+    """
+
+    if not isinstance(code, basestring) or \
+       not code.startswith("wx.BitmapFromImage("):
+        return
+
+    match = bitmap_code_regex.match(code)
+
+    if match is None:
+        return
+
+    width, height, data = match.groups()
+
+    return get_bitmap_from_data(int(width), int(height), str(data))
+
+
 def code2color(color_string):
     """Returns wx.Colour from 3-tuple of floats in [0.0, 1.0]"""
 
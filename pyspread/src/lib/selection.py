@@ -27,7 +27,10 @@ Grid selection representation
 
 """
 
-from itertools import izip
+from bisect import bisect_right
+from itertools import islice, izip
+
+import numpy
 
 
 class Selection(object):
@@ -47,6 +50,10 @@ class Selection(object):
     cells: List of 2-tuples
     \tList of (row, column) tuples of individually selected cells
 
+    Membership tests use a compiled representation of the selection, which
+    is rebuilt when an attribute list is replaced or changes its length.
+    Therefore, attribute list items must not be replaced in place.
+
     """
 
     def __init__(self, block_top_left, block_bottom_right, rows, cols, cells):
@@ -56,6 +63,9 @@ class Selection(object):
         self.cols = cols
         self.cells = cells
 
+        # Attribute lists, their lengths and compiled selection
+        self._compiled = None
+
     def __nonzero__(self):
         """Returns True iif any attribute is non-empty"""
 
@@ -86,6 +96,42 @@ class Selection(object):
 
         return all(getattr(self, at) == getattr(other, at) for at in attrs)
 
+    def _compile(self):
+        """Returns compiled selection
+
+        The compiled selection is a tuple of
+
+         * List of (top, left, bottom, right) blocks that is sorted by top
+         * Sorted list of block tops
+         * Set of selected rows
+         * Set of selected columns
+         * Set of (row, column) tuples of selected cells
+
+        """
+
+        attrs = self.block_tl, self.block_br, self.rows, self.cols, self.cells
+        lengths = map(len, attrs)
+
+        if self._compiled is not None:
+            compiled_attrs, compiled_lengths, compiled = self._compiled
+
+            if lengths == compiled_lengths and \
+               all(attr is compiled_attr
+                   for attr, compiled_attr in izip(attrs, compiled_attrs)):
+                return compiled
+
+        blocks = sorted((top, left, bottom, right)
+                        for (top, left), (bottom, right)
+                        in izip(self.block_tl, self.block_br))
+        tops = [block[0] for block in blocks]
+
+        compiled = (blocks, tops, set(self.rows), set(self.cols),
+                    set(tuple(cell) for cell in self.cells))
+
+        self._compiled = attrs, lengths, compiled
+
+        return compiled
+
     def __contains__(self, cell):
         """Returns True iif cell is in selection
 
@@ -101,25 +147,69 @@ class Selection(object):
 
         cell_row, cell_col = cell
 
-        # Block selections
-        for top_left, bottom_right in izip(self.block_tl, self.block_br):
-            top, left = top_left
-            bottom, right = bottom_right
+        blocks, tops, rows, cols, cells = self._compile()
 
-            if top <= cell_row <= bottom and left <= cell_col <= right:
+        # Block selections, only blocks with top <= cell_row are checked
+        for __, left, bottom, right in \
+                islice(blocks, bisect_right(tops, cell_row)):
+            if cell_row <= bottom and left <= cell_col <= right:
                 return True
 
         # Row and column selections
 
-        if cell_row in self.rows or cell_col in self.cols:
+        if cell_row in rows or cell_col in cols:
             return True
 
         # Cell selections
-        if cell in self.cells:
+        if tuple(cell) in cells:
             return True
 
         return False
 
+    def contains_many(self, keys):
+        """Returns boolean numpy array that is True for keys in selection
+
+        Parameters
+        ----------
+
+        keys: Iterable of 2-tuples or 3-tuples of Integer
+        \tKeys that are checked, tables are ignored
+
+        """
+
+        keys = numpy.array(list(keys), dtype=numpy.int64)
+
+        if not len(keys):
+            return numpy.zeros(0, dtype=bool)
+
+        key_rows = keys[:, 0]
+        key_cols = keys[:, 1]
+
+        blocks, __, rows, cols, cells = self._compile()
+
+        # Row and column selections
+
+        contained = numpy.in1d(key_rows, list(rows)) | \
+            numpy.in1d(key_cols, list(cols))
+
+        # Block selections
+
+        for top, left, bottom, right in blocks:
+            contained |= (key_rows >= top) & (key_rows <= bottom) & \
+                         (key_cols >= left) & (key_cols <= right)
+
+        # Cell selections are compared as one complex number per cell
+
+        if cells:
+            cell_array = numpy.array(list(cells), dtype=numpy.int64)
+
+            key_codes = key_rows + 1j * key_cols
+            cell_codes = cell_array[:, 0] + 1j * cell_array[:, 1]
+
+            contained |= numpy.in1d(key_codes, cell_codes)
+
+        return contained
+
     def __add__(self, value):
         """Shifts selection down and / or right
 
@@ -205,7 +295,7 @@ class Selection(object):
                 bb_left = left
             if bb_bottom is None or bb_bottom < bottom:
                 bb_bottom = bottom
-            if bb_right is None or bb_right > right:
+            if bb_right is None or bb_right < right:
                 bb_right = right
 
         # Row and column selections
@@ -268,9 +358,54 @@ class Selection(object):
 
         return ((bb_top, bb_left), (bb_bottom, bb_right))
 
+    def mask(self, bbox):
+        """Returns boolean numpy array that is True for selected cells
+
+        Parameters
+        ----------
+
+        bbox: 2-tuple of 2-tuples of Integer
+        \t((top, left), (bottom, right)) of the masked area, bounds inclusive
+
+        """
+
+        (top, left), (bottom, right) = bbox
+
+        mask = numpy.zeros((bottom - top + 1, right - left + 1), dtype=bool)
+
+        # Block selections
+
+        for (b_top, b_left), (b_bottom, b_right) in \
+                izip(self.block_tl, self.block_br):
+            row_slice = slice(max(0, b_top - top), max(0, b_bottom - top + 1))
+            col_slice = slice(max(0, b_left - left),
+                              max(0, b_right - left + 1))
+            mask[row_slice, col_slice] = True
+
+        # Row and column selections
+
+        rows = numpy.array(self.rows, dtype=int) - top
+        mask[rows[(rows >= 0) & (rows < mask.shape[0])], :] = True
+
+        cols = numpy.array(self.cols, dtype=int) - left
+        mask[:, cols[(cols >= 0) & (cols < mask.shape[1])]] = True
+
+        # Cell selections
+
+        for cell_row, cell_col in self.cells:
+            if top <= cell_row <= bottom and left <= cell_col <= right:
+                mask[cell_row - top, cell_col - left] = True
+
+        return mask
+
     def get_access_string(self, shape, table):
         """Returns a string, with which the selection can be accessed
 
+        Except for single cells, the string evaluates to a list of the
+        results of all populated cells in the selection that are not None.
+        Keys are generated lazily by S.iter_access_keys. Cells in
+        overlapping parts of the selection are accessed once per part.
+
         Parameters
         ----------
         shape: 3-tuple of Integer
@@ -280,7 +415,7 @@ class Selection(object):
 
         """
 
-        rows, columns, tables = shape
+        tables = shape[2]
 
         # Negative dimensions cannot be
         assert all(dim > 0 for dim in shape)
@@ -288,36 +423,20 @@ class Selection(object):
         # Current table has to be in dimensions
         assert 0 <= table < tables
 
-        string_list = []
+        attrs = self.block_tl, self.block_br, self.rows, self.cols, self.cells
 
-        # Block selections
-        templ = "[(r, c, {}) for r in xrange({}, {}) for c in xrange({}, {})]"
-        for (top, left), (bottom, right) in izip(self.block_tl, self.block_br):
-            string_list += [templ.format(table, top, bottom + 1,
-                                         left, right + 1)]
-
-        # Fully selected rows
-        template = "[({}, c, {}) for c in xrange({})]"
-        for row in self.rows:
-            string_list += [template.format(row, table, columns)]
-
-        # Fully selected columns
-        template = "[(r, {}, {}) for r in xrange({})]"
-        for column in self.cols:
-            string_list += [template.format(column, table, rows)]
-
-        # Single cells
-        for row, column in self.cells:
-            string_list += [repr([(row, column, table)])]
-
-        key_string = " + ".join(string_list)
-
-        if len(string_list) == 0:
+        if not self:
             return ""
 
-        elif len(self.cells) == 1 and len(string_list) == 1:
-            return "S[{}]".format(string_list[0][1:-1])
+        elif len(self.cells) == 1 and not any(attrs[:4]):
+            row, column = self.cells[0]
+            return "S[{}]".format(repr((row, column, table)))
 
         else:
-            template = "[S[key] for key in {} if S[key] is not None]"
-            return template.format(key_string)
\ No newline at end of file
+            # Only populated cells of the selection are accessed
+            selection_string = "Selection({}, {}, {}, {}, {})"
+            selection_string = selection_string.format(*map(repr, attrs))
+
+            template = "[S[key] for key in S.iter_access_keys({}, {}) " + \
+                "if S[key] is not None]"
+            return template.format(selection_string, table)
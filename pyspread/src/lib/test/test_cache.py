@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Unit test for cache.py"""
+
+# --------------------------------------------------------------------
+# pyspread is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyspread is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyspread.  If not, see <http://www.gnu.org/licenses/>.
+# --------------------------------------------------------------------
+
+import os
+import sys
+import threading
+
+import pytest
+
+TESTPATH = "/".join(os.path.realpath(__file__).split("/")[:-1]) + "/"
+sys.path.insert(0, TESTPATH)
+sys.path.insert(0, TESTPATH + "/../../..")
+sys.path.insert(0, TESTPATH + "/../..")
+
+from src.lib.testlib import params, pytest_generate_tests
+
+import numpy
+
+from src.lib.cache import LRUCache, get_object_size
+
+
+def test_get_object_size():
+    """Unit test for get_object_size"""
+
+    assert get_object_size(numpy.zeros(1000)) >= 8000
+    assert get_object_size("x" * 1000) >= 1000
+    assert get_object_size(None) > 0
+
+
+class TestLRUCache(object):
+    """Unit tests for LRUCache"""
+
+    def setup_method(self, method):
+        """Creates cache that holds 3 items"""
+
+        self.cache = LRUCache(3)
+
+    def test_getitem(self):
+        """Unit test for __getitem__"""
+
+        self.cache["a"] = 1
+
+        assert self.cache["a"] == 1
+
+        with pytest.raises(KeyError):
+            self.cache["b"]
+
+        assert self.cache.hits == 1
+        assert self.cache.misses == 1
+
+    def test_eviction(self):
+        """Least recently used items are evicted first"""
+
+        for key in "abc":
+            self.cache[key] = key
+
+        # Touch a so that b is the least recently used item
+        self.cache["a"]
+
+        self.cache["d"] = "d"
+
+        assert "b" not in self.cache
+        assert all(key in self.cache for key in "acd")
+        assert self.cache.evictions == 1
+
+    param_size = [
+        {'sizes': [1, 1, 1], 'max_size': 3, 'res_keys': [0, 1, 2]},
+        {'sizes': [2, 2], 'max_size': 3, 'res_keys': [1]},
+        {'sizes': [1, 5, 1], 'max_size': 3, 'res_keys': [0, 2]},
+        {'sizes': [3, 1], 'max_size': 3, 'res_keys': [1]},
+    ]
+
+    @params(param_size)
+    def test_size(self, sizes, max_size, res_keys):
+        """Unit test for size budget"""
+
+        cache = LRUCache(max_size, get_size=lambda value: value)
+
+        for i, size in enumerate(sizes):
+            cache[i] = size
+
+        assert [i for i in xrange(len(sizes)) if i in cache] == res_keys
+        assert cache.size == sum(sizes[i] for i in res_keys)
+        assert cache.size <= max_size
+
+    def test_pop_clear(self):
+        """Unit test for pop and clear"""
+
+        self.cache["a"] = 1
+        self.cache["b"] = 2
+
+        assert self.cache.keys() == ["a", "b"]
+
+        assert self.cache.pop("a") == 1
+        assert self.cache.pop("a", 5) == 5
+        assert len(self.cache) == 1
+
+        self.cache.clear()
+
+        assert len(self.cache) == 0
+        assert self.cache.get_stats()["size"] == 0
+
+    def test_threads(self):
+        """Concurrent reads and writes keep the size bookkeeping intact"""
+
+        cache = LRUCache(50)
+
+        def worker(offset):
+            for i in xrange(1000):
+                cache[(offset + i) % 100] = i
+                cache.get((offset + i * 7) % 100)
+                cache.keys()
+
+        threads = [threading.Thread(target=worker, args=(offset,))
+                   for offset in xrange(4)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        assert cache.size == len(cache) == len(cache.keys())
+        assert cache.size <= 50
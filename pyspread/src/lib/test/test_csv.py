@@ -199,3 +199,24 @@ class TestTxtGenerator(object):
 
         res = [[ele for ele in line] for line in self.txtgen]
         assert res == [["Hallo", "Welt"], ["Test", "2"]]
+
+    param_iter_shape = [
+        {'shape': (2, 2), 'res': [["Hallo", "Welt"], ["Test", "2"]],
+         'row_overflow': False, 'col_overflow': False},
+        {'shape': (1, 2), 'res': [["Hallo", "Welt"]],
+         'row_overflow': True, 'col_overflow': False},
+        {'shape': (2, 1), 'res': [["Hallo"], ["Test"]],
+         'row_overflow': False, 'col_overflow': True},
+    ]
+
+    @params(param_iter_shape)
+    def test_iter_shape(self, shape, res, row_overflow, col_overflow):
+        """Unit test for __iter__ with limited shape"""
+
+        filepath = TESTPATH + 'test_txt.csv'
+        txtgen = TxtGenerator(self.main_window, filepath, shape=shape,
+                              block_size=1)
+
+        assert [line for line in txtgen] == res
+        assert txtgen.row_overflow == row_overflow
+        assert txtgen.col_overflow == col_overflow
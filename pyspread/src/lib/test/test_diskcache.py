@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Unit test for diskcache.py"""
+
+# --------------------------------------------------------------------
+# pyspread is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyspread is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyspread.  If not, see <http://www.gnu.org/licenses/>.
+# --------------------------------------------------------------------
+
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+TESTPATH = "/".join(os.path.realpath(__file__).split("/")[:-1]) + "/"
+sys.path.insert(0, TESTPATH)
+sys.path.insert(0, TESTPATH + "/../../..")
+sys.path.insert(0, TESTPATH + "/../..")
+
+from src.lib.diskcache import DiskCache, get_digest
+
+
+def test_get_digest():
+    """Unit test for get_digest"""
+
+    assert get_digest((0, 0, 0), "1") == get_digest((0, 0, 0), "1")
+    assert get_digest((0, 0, 0), "1") != get_digest((0, 0, 1), "1")
+
+    with pytest.raises(Exception):
+        get_digest(lambda: None)
+
+
+class TestDiskCache(object):
+    """Unit tests for DiskCache"""
+
+    def setup_method(self, method):
+        """Creates cache in a temporary directory"""
+
+        self.path = tempfile.mkdtemp()
+        self.cache = DiskCache(os.path.join(self.path, "cache"), 1000)
+
+    def teardown_method(self, method):
+        shutil.rmtree(self.path)
+
+    def test_getitem(self):
+        """Unit test for __getitem__ and __setitem__"""
+
+        self.cache["a"] = [1, 2, 3]
+
+        assert "a" in self.cache
+        assert self.cache["a"] == [1, 2, 3]
+
+        with pytest.raises(KeyError):
+            self.cache["b"]
+
+        assert self.cache.get("b", 5) == 5
+        assert self.cache.hits == 1
+        assert self.cache.misses == 2
+
+    def test_eviction(self):
+        """Least recently used files are evicted first"""
+
+        value = "x" * 300
+
+        for i, digest in enumerate("abc"):
+            self.cache[digest] = value
+            os.utime(self.cache._get_filepath(digest), (i, i))
+
+        self.cache["d"] = value
+
+        assert "a" not in self.cache
+        assert all(digest in self.cache for digest in "bcd")
+        assert self.cache.evictions == 1
+        assert self.cache.get_stats()["size"] <= 1000
+
+    def test_too_large(self):
+        """Values that are larger than max_size are not stored"""
+
+        self.cache["a"] = "x" * 2000
+
+        assert "a" not in self.cache
+
+    def test_clear(self):
+        """Unit test for clear"""
+
+        self.cache["a"] = 1
+        self.cache["b"] = 2
+
+        self.cache.clear()
+
+        assert self.cache.get_stats()["items"] == 0
@@ -28,6 +28,8 @@ Unit tests for parsers.py
 
 """
 
+import base64
+import bz2
 import os
 import sys
 
@@ -42,6 +44,7 @@ sys.path.insert(0, TESTPATH + "/../..")
 from src.lib.testlib import params, pytest_generate_tests
 
 from src.lib.parsers import get_font_from_data, get_pen_from_data
+from src.lib.parsers import get_bitmap_from_data, get_bitmap_from_code
 
 param_font = [
     {"fontdata": "Sans 13", "face": "Sans", "size": 13},
@@ -75,4 +78,40 @@ def test_get_pen_from_data(pendata, width, color):
     pen = get_pen_from_data(pendata)
 
     assert pen.GetColour() == color
-    assert pen.GetWidth() == width
\ No newline at end of file
+    assert pen.GetWidth() == width
+
+
+def test_get_bitmap_from_data():
+    """Unit test for get_bitmap_from_data"""
+
+    data = base64.b64encode(bz2.compress("\xff\x00\x00" * 6))
+
+    bmp = get_bitmap_from_data(3, 2, data)
+
+    assert bmp.GetWidth() == 3
+    assert bmp.GetHeight() == 2
+
+    # Decoded bitmaps are cached
+    assert get_bitmap_from_data(3, 2, data) is bmp
+
+
+def test_get_bitmap_from_code():
+    """Unit test for get_bitmap_from_code"""
+
+    data = base64.b64encode(bz2.compress("\x00\xff\x00" * 6))
+
+    code = "wx.BitmapFromImage(wx.ImageFromData(" + \
+        "3, 2, bz2.decompress(base64.b64decode('{data}'))))".format(data=data)
+
+    bmp = get_bitmap_from_code(code)
+
+    assert bmp.GetWidth() == 3
+    assert bmp.GetHeight() == 2
+
+    # Code of pasted bitmaps shares the decoded bitmap cache
+    assert get_bitmap_from_data(3, 2, data) is bmp
+
+    # Other code is not handled
+    assert get_bitmap_from_code(code + " + 1") is None
+    assert get_bitmap_from_code("1") is None
+    assert get_bitmap_from_code(None) is None
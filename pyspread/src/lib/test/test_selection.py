@@ -157,6 +157,25 @@ class TestSelection(object):
 
         assert (key in sel) == res
 
+    @params(param_test_contains)
+    def test_contains_many(self, sel, key, res):
+        """Unit test for contains_many with single keys"""
+
+        assert sel.contains_many([key]).tolist() == [res]
+
+    def test_contains_many_keys(self):
+        """Unit test for contains_many with multiple 3-tuple keys"""
+
+        sel = Selection([(4, 5)], [(10, 20)], [0], [1], [(30, 30)])
+        keys = [(0, 3, 0), (3, 1, 0), (5, 6, 2), (30, 30, 1), (30, 31, 1),
+                (11, 20, 0)]
+
+        res = sel.contains_many(keys)
+
+        assert res.tolist() == [True, True, True, True, False, False]
+        assert res.tolist() == [key[:2] in sel for key in keys]
+        assert sel.contains_many([]).tolist() == []
+
     param_test_add = [
         {'sel': Selection([], [], [], [], [(0, 0), (34, 56)]),
          'add': (4, 5),
@@ -198,11 +217,42 @@ class TestSelection(object):
         sel.insert(point, number, axis)
         assert sel == res
 
+    param_test_mask = [
+        {'sel': Selection([], [], [], [], [(1, 1), (2, 0)]),
+         'bbox': ((0, 0), (2, 1)),
+         'res': [[False, False], [False, True], [True, False]]},
+        {'sel': Selection([(1, 1)], [(5, 5)], [], [], []),
+         'bbox': ((0, 0), (1, 2)),
+         'res': [[False, False, False], [False, True, True]]},
+        {'sel': Selection([], [], [1], [3], []),
+         'bbox': ((0, 2), (1, 3)),
+         'res': [[False, True], [True, True]]},
+        {'sel': Selection([], [], [10], [30], [(40, 40)]),
+         'bbox': ((0, 0), (1, 1)),
+         'res': [[False, False], [False, False]]},
+    ]
+
+    @params(param_test_mask)
+    def test_mask(self, sel, bbox, res):
+        """Unit test for mask"""
+
+        mask = sel.mask(bbox)
+
+        assert mask.tolist() == res
+
+        # Mask is consistent with __contains__
+        (top, left), __ = bbox
+        for row, col in zip(*mask.nonzero()):
+            assert (top + row, left + col) in sel
+
     param_test_get_bbox = [
         {'sel': Selection([], [], [], [], [(32, 53), (34, 56)]),
          'res': ((32, 53), (34, 56))},
         {'sel': Selection([(4, 5)], [(100, 200)], [], [], []),
          'res': ((4, 5), (100, 200))},
+        {'sel': Selection([(4, 5), (2, 2)], [(100, 200), (7, 300)], [], [],
+                          []),
+         'res': ((2, 2), (100, 300))},
     ]
 
     @params(param_test_get_bbox)
@@ -210,3 +260,18 @@ class TestSelection(object):
         """Unit test for get_bbox"""
 
         assert sel.get_bbox() == res
+
+    param_test_get_access_string = [
+        {'sel': Selection([], [], [], [], []), 'table': 0, 'res': ""},
+        {'sel': Selection([], [], [], [], [(32, 53)]), 'table': 1,
+         'res': "S[(32, 53, 1)]"},
+        {'sel': Selection([(1, 2)], [(3, 4)], [], [], [(5, 6)]), 'table': 0,
+         'res': "[S[key] for key in S.iter_access_keys(Selection([(1, 2)], "
+                "[(3, 4)], [], [], [(5, 6)]), 0) if S[key] is not None]"},
+    ]
+
+    @params(param_test_get_access_string)
+    def test_get_access_string(self, sel, table, res):
+        """Unit test for get_access_string"""
+
+        assert sel.get_access_string((1000, 100, 3), table) == res
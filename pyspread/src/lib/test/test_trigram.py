@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Unit test for trigram.py"""
+
+# --------------------------------------------------------------------
+# pyspread is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyspread is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyspread.  If not, see <http://www.gnu.org/licenses/>.
+# --------------------------------------------------------------------
+
+import os
+import sys
+
+import pytest
+
+TESTPATH = "/".join(os.path.realpath(__file__).split("/")[:-1]) + "/"
+sys.path.insert(0, TESTPATH)
+sys.path.insert(0, TESTPATH + "/../../..")
+sys.path.insert(0, TESTPATH + "/../..")
+
+from src.lib.testlib import params, pytest_generate_tests
+
+from src.lib.trigram import get_trigrams, TrigramIndex
+
+
+param_get_trigrams = [
+    {'string': "", 'res': set()},
+    {'string': "ab", 'res': set()},
+    {'string': "abc", 'res': set(["abc"])},
+    {'string': "AbCd", 'res': set(["abc", "bcd"])},
+    {'string': "aaaa", 'res': set(["aaa"])},
+]
+
+
+@params(param_get_trigrams)
+def test_get_trigrams(string, res):
+    """Unit test for get_trigrams"""
+
+    assert get_trigrams(string) == res
+
+
+class TestTrigramIndex(object):
+    """Unit tests for TrigramIndex"""
+
+    def setup_method(self, method):
+        """Creates index with three strings"""
+
+        self.index = TrigramIndex()
+
+        self.index.update([((0, 0, 0), u"Hello world"),
+                           ((1, 0, 0), u"hello"),
+                           ((2, 0, 0), u"World peace")])
+
+    param_candidates = [
+        {'find_string': "hello", 'res': set([(0, 0, 0), (1, 0, 0)])},
+        {'find_string': "WORLD", 'res': set([(0, 0, 0), (2, 0, 0)])},
+        {'find_string': "lo wo", 'res': set([(0, 0, 0)])},
+        {'find_string': "xyz", 'res': set()},
+        {'find_string': "he", 'res': None},
+    ]
+
+    @params(param_candidates)
+    def test_candidates(self, find_string, res):
+        """Unit test for candidates"""
+
+        assert self.index.candidates(find_string) == res
+
+    def test_add_remove(self):
+        """Unit test for add and remove"""
+
+        self.index.add((1, 0, 0), u"peace")
+        assert self.index.candidates("hello") == set([(0, 0, 0)])
+        assert self.index.candidates("peace") == set([(1, 0, 0), (2, 0, 0)])
+
+        self.index.remove((2, 0, 0))
+        self.index.remove((5, 0, 0))
+        assert self.index.candidates("peace") == set([(1, 0, 0)])
+        assert "wor" in self.index.postings
+        assert "pea" in self.index.postings
+
+        self.index.remove((0, 0, 0))
+        assert "wor" not in self.index.postings
+        assert len(self.index) == 1
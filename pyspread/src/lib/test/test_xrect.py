@@ -227,3 +227,40 @@ class TestRotoRect(object):
         clash_rect = xrect.Rect(x1, y1, w1, h1)
 
         assert base_rect.collides(clash_rect) == res
+
+    param_collides_axisaligned_rects = [
+        {'x': 0, 'y': 0, 'w': 20, 'h': 10, 'angle': 0},
+        {'x': 50, 'y': 0, 'w': 20, 'h': 10, 'angle': 30},
+        {'x': 5, 'y': 3, 'w': 40, 'h': 12, 'angle': 90},
+        {'x': -7, 'y': 20, 'w': 60, 'h': 10, 'angle': -135},
+    ]
+
+    @params(param_collides_axisaligned_rects)
+    def test_collides_axisaligned_rects(self, x, y, w, h, angle):
+        """Batch collisions are identical to single collisions"""
+
+        base_rect = xrect.RotoRect(x, y, w, h, angle)
+
+        rects = [(rx, ry, 15, 8) for rx in xrange(-80, 80, 7)
+                 for ry in xrange(-60, 60, 5)]
+
+        collisions = base_rect.collides_axisaligned_rects(rects)
+
+        assert collisions.dtype == numpy.bool_
+        assert collisions.tolist() == \
+            [base_rect.collides(xrect.Rect(*rect)) for rect in rects]
+
+    def test_get_corners(self):
+        """Corners of shifted rects are shifted corners"""
+
+        base_rect = xrect.RotoRect(5, 3, 40, 12, 30)
+        shifted_rect = xrect.RotoRect(15, 23, 40, 12, 30)
+
+        corners = base_rect.get_corners() + (10, 20)
+
+        assert numpy.allclose(shifted_rect.get_corners(), corners)
+
+        # Provided corners are not recomputed
+        cached_rect = xrect.RotoRect(15, 23, 40, 12, 30, corners=corners)
+
+        assert cached_rect.get_corners() is corners
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright Martin Manns
+# Distributed under the terms of the GNU General Public License
+
+# --------------------------------------------------------------------
+# pyspread is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyspread is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyspread.  If not, see <http://www.gnu.org/licenses/>.
+# --------------------------------------------------------------------
+
+"""
+
+Trigram
+=======
+
+trigram.py contains a trigram index for substring search in strings.
+
+"""
+
+
+def get_trigrams(string):
+    """Returns set of all lower case trigrams in string"""
+
+    string = string.lower()
+
+    return set(string[i:i+3] for i in xrange(len(string) - 2))
+
+
+class TrigramIndex(object):
+    """Index that maps trigrams to the keys of strings that contain them
+
+    Trigrams are stored in lower case so that the index can be used for
+    case sensitive and case insensitive search. Candidates that are
+    returned by the index contain all trigrams of the search string.
+    They have to be checked for an actual match.
+
+    """
+
+    def __init__(self):
+        # Maps trigram to set of keys
+        self.postings = {}
+
+        # Maps key to set of trigrams
+        self.trigrams = {}
+
+    def __len__(self):
+        return len(self.trigrams)
+
+    def add(self, key, string):
+        """Adds string for key to the index, replaces old string of key"""
+
+        self.remove(key)
+
+        if not isinstance(string, basestring):
+            string = u""
+
+        trigrams = get_trigrams(string)
+
+        for trigram in trigrams:
+            self.postings.setdefault(trigram, set()).add(key)
+
+        self.trigrams[key] = trigrams
+
+    def remove(self, key):
+        """Removes key from the index if present"""
+
+        for trigram in self.trigrams.pop(key, ()):
+            posting = self.postings[trigram]
+            posting.discard(key)
+
+            if not posting:
+                del self.postings[trigram]
+
+    def update(self, key_strings):
+        """Adds strings from iterable of (key, string) tuples"""
+
+        for key, string in key_strings:
+            self.add(key, string)
+
+    def candidates(self, find_string):
+        """Returns set of keys of strings that may contain find_string
+
+        Returns None if find_string is too short for using the index.
+
+        Parameters
+        ----------
+
+        find_string: String
+        \tString to be searched for
+
+        """
+
+        trigrams = get_trigrams(find_string)
+
+        if not trigrams:
+            return
+
+        postings = []
+
+        for trigram in trigrams:
+            try:
+                postings.append(self.postings[trigram])
+
+            except KeyError:
+                return set()
+
+        # Intersect smallest posting lists first
+        postings.sort(key=len)
+
+        candidates = set(postings[0])
+
+        for posting in postings[1:]:
+            candidates &= posting
+
+            if not candidates:
+                break
+
+        return candidates
+
+# End of class TrigramIndex
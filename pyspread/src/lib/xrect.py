@@ -5,6 +5,8 @@
 
 from math import sin, cos, pi
 
+import numpy
+
 
 class Rect(object):
     """Rectangle class for axis aligned 2D rectangles
@@ -239,10 +241,12 @@ class RotoRect(object):
     \tRectangle height
     angle: Number:
     \tRectangle rotation angle counter clock-wise around origin
+    corners: (4, 2) array, defaults to None
+    \tPrecomputed corner coordinates, e. g. from a cached text layout
 
     """
 
-    def __init__(self, x, y, width, height, angle):
+    def __init__(self, x, y, width, height, angle, corners=None):
         self.x = x
         self.y = y
         self.width = width
@@ -250,6 +254,8 @@ class RotoRect(object):
         self.angle_rad = angle / 180.0 * pi
         self.angle_deg = angle
 
+        self._corners = corners
+
     def __str__(self):
         return "RotoRect(" + \
             ", ".join(map(str, (self.x, self.y,
@@ -285,6 +291,75 @@ class RotoRect(object):
 
         return self_shifted.collides(other_shifted)
 
+    def get_corners(self):
+        """Returns (4, 2) array of corner coordinates
+
+        The corners are computed once unless they have been provided.
+
+        """
+
+        if self._corners is not None:
+            return self._corners
+
+        c_a = cos(self.angle_rad)
+        s_a = sin(self.angle_rad)
+
+        origin = numpy.array([self.x, self.y], dtype=float)
+        width_vec = numpy.array([c_a, -s_a]) * self.width
+        height_vec = numpy.array([-s_a, -c_a]) * self.height
+
+        self._corners = numpy.array([origin,
+                                     origin + width_vec,
+                                     origin + width_vec + height_vec,
+                                     origin + height_vec])
+
+        return self._corners
+
+    def collides_axisaligned_rects(self, rects):
+        """Returns boolean array of collisions with many axis aligned rects
+
+        Separating axis test with the axes of the rects and the edge
+        directions of self, vectorized over all rects.
+
+        Parameters
+        ----------
+
+        rects: Iterable of 4-tuples
+        \tx, y, width, height of the axis aligned rects
+
+        """
+
+        rects = numpy.asarray(rects, dtype=float).reshape(-1, 4)
+        x, y, width, height = rects.T
+
+        corners = self.get_corners()
+        corners_x_min, corners_y_min = corners.min(axis=0)
+        corners_x_max, corners_y_max = corners.max(axis=0)
+
+        # Axes of the axis aligned rects
+
+        collisions = (x <= corners_x_max) & (corners_x_min <= x + width) & \
+                     (y <= corners_y_max) & (corners_y_min <= y + height)
+
+        # Edge directions of self
+
+        center_x = x + 0.5 * width
+        center_y = y + 0.5 * height
+
+        c_a = cos(self.angle_rad)
+        s_a = sin(self.angle_rad)
+
+        for axis_x, axis_y in [(c_a, -s_a), (-s_a, -c_a)]:
+            projection = corners[:, 0] * axis_x + corners[:, 1] * axis_y
+
+            rects_center = center_x * axis_x + center_y * axis_y
+            rects_radius = 0.5 * (width * abs(axis_x) + height * abs(axis_y))
+
+            collisions &= (rects_center - rects_radius <= projection.max())
+            collisions &= (projection.min() <= rects_center + rects_radius)
+
+        return collisions
+
     def collides(self, other):
         """Returns collision with other rect"""
 
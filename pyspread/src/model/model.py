@@ -36,13 +36,15 @@ Layer 0: KeyValueStore
 
 import ast
 import base64
+from bisect import bisect_left, bisect_right
 import bz2
 from copy import copy
 import cStringIO
 import datetime
-from itertools import imap, ifilter, product
+from itertools import chain, imap, ifilter, izip, product
 import re
 import sys
+import time
 from types import SliceType, IntType
 
 import numpy
@@ -53,6 +55,10 @@ from src.config import config
 
 from src.lib.typechecks import is_slice_like, is_string_like, is_generator_like
 from src.lib.selection import Selection
+from src.lib.cache import LRUCache, get_object_size
+from src.lib.diskcache import DiskCache, get_digest
+from src.lib.parsers import get_bitmap_from_code
+from src.lib.trigram import TrigramIndex
 
 import src.lib.charts as charts
 
@@ -117,6 +123,10 @@ class CellAttributes(list):
 
     _attr_cache = {}
 
+    # Tuple of len and set of frozen keys, None if outdated
+
+    _frozen_keys = None
+
     def undoable_append(self, value):
         """Appends item to list and provides undo and redo functionality"""
 
@@ -128,7 +138,52 @@ class CellAttributes(list):
         self.unredo.mark()
 
         self.append(value)
+        self.clear_caches()
+
+    def clear_caches(self):
+        """Clears cached attributes, required after in place changes"""
+
         self._attr_cache.clear()
+        self._frozen_keys = None
+
+    def get_frozen_keys(self):
+        """Returns set of keys of frozen cells
+
+        Frozen cells are only supported for single cell selections.
+        If the frozen attribute is set for a block, row or column selection
+        then None is returned and the attributes have to be looked up.
+
+        The set is cached until the number of attributes changes or the
+        caches are cleared. Undo and redo are covered by this.
+
+        """
+
+        if self._frozen_keys is not None:
+            cache_len, frozen_keys = self._frozen_keys
+
+            if cache_len == len(self):
+                return frozen_keys
+
+        frozen_keys = set()
+
+        for selection, table, attr_dict in self:
+            if "frozen" not in attr_dict:
+                continue
+
+            if selection.block_tl or selection.rows or selection.cols:
+                frozen_keys = None
+                break
+
+            keys = set((row, col, table) for row, col in selection.cells)
+
+            if attr_dict["frozen"]:
+                frozen_keys |= keys
+            else:
+                frozen_keys -= keys
+
+        self._frozen_keys = len(self), frozen_keys
+
+        return frozen_keys
 
     def __getitem__(self, key):
         """Returns attribute dict for a single key"""
@@ -419,6 +474,33 @@ class DictGrid(KeyValueStore, ParserMixin, StringGeneratorMixin):
         self.row_heights = {}  # Keys have the format (row, table)
         self.col_widths = {}  # Keys have the format (col, table)
 
+        # Index of populated cells with the format {table: {row: set(cols)}}
+        self._index = {}
+
+        # Sorted list of reversed keys (tab, col, row), None if outdated
+        self._search_order = None
+
+        # Incremented on each change of cell code
+        self.version = 0
+
+        # Trigram index of cell code, built on first use
+        self.trigram_index = None
+
+    def __reduce__(self):
+        """Pickle support
+
+        Cells are restored via __setitem__ after __init__ so that the
+        indices of populated cells are rebuilt on unpickling.
+
+        """
+
+        state = self.__dict__.copy()
+
+        for attr in ("_index", "_search_order", "trigram_index"):
+            state.pop(attr, None)
+
+        return self.__class__, (self.shape,), state, None, self.iteritems()
+
     def __getitem__(self, key):
 
         shape = self.shape
@@ -431,6 +513,161 @@ class DictGrid(KeyValueStore, ParserMixin, StringGeneratorMixin):
 
         return KeyValueStore.__getitem__(self, key)
 
+    # Populated cell index maintenance
+
+    def _add_to_index(self, key):
+        """Adds key to the populated cell index"""
+
+        row, col, tab = key
+        self._index.setdefault(tab, {}).setdefault(row, set()).add(col)
+
+        self._search_order = None
+
+    def _remove_from_index(self, key):
+        """Removes key from the populated cell index"""
+
+        row, col, tab = key
+
+        tab_index = self._index[tab]
+        row_index = tab_index[row]
+
+        row_index.discard(col)
+
+        self._search_order = None
+
+        if not row_index:
+            del tab_index[row]
+
+            if not tab_index:
+                del self._index[tab]
+
+    def __setitem__(self, key, value):
+
+        if not dict.__contains__(self, key):
+            self._add_to_index(key)
+            changed = True
+
+        else:
+            changed = dict.__getitem__(self, key) != value
+
+        if changed:
+            self.version += 1
+
+            if self.trigram_index is not None:
+                self.trigram_index.add(key, value)
+
+        KeyValueStore.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+
+        KeyValueStore.__delitem__(self, key)
+        self._remove_from_index(key)
+        self.version += 1
+
+        if self.trigram_index is not None:
+            self.trigram_index.remove(key)
+
+    def pop(self, key, *default):
+        """Pops key from grid and populated cell index"""
+
+        if dict.__contains__(self, key):
+            self._remove_from_index(key)
+            self.version += 1
+
+            if self.trigram_index is not None:
+                self.trigram_index.remove(key)
+
+        return KeyValueStore.pop(self, key, *default)
+
+    def update(self, *args, **kwargs):
+        """Updates grid and populated cell index"""
+
+        for key, value in dict(*args, **kwargs).iteritems():
+            self[key] = value
+
+    def clear(self):
+        """Empties grid and populated cell index"""
+
+        KeyValueStore.clear(self)
+        self._index.clear()
+        self._search_order = None
+        self.version += 1
+        self.trigram_index = None
+
+    def populated_keys(self, bbox, tab):
+        """Generator of populated keys inside bbox in row major order
+
+        Work is proportional to the number of populated cells inside the
+        bounding box plus the smaller one of the number of populated rows
+        of the table and the number of rows of the bounding box.
+        The same holds for columns within each row.
+
+        Parameters
+        ----------
+
+        bbox: 2-tuple of 2-tuples of Integer
+        \t((top, left), (bottom, right)) of the area, bounds inclusive
+        tab: Integer
+        \tTable of the area
+
+        """
+
+        (top, left), (bottom, right) = bbox
+
+        tab_index = self._index.get(tab, {})
+
+        for row in self._get_index_range(tab_index, top, bottom):
+            for col in self._get_index_range(tab_index[row], left, right):
+                yield row, col, tab
+
+    def _get_index_range(self, index, start, stop):
+        """Returns sorted list of index members in [start, stop]
+
+        Parameters
+        ----------
+
+        index: Dict or set
+        \tPopulated rows of a table or populated columns of a row
+        start: Integer
+        \tFirst member to be returned
+        stop: Integer
+        \tLast member to be returned
+
+        """
+
+        if stop - start < len(index):
+            return [ele for ele in xrange(start, stop + 1) if ele in index]
+
+        else:
+            return sorted(ele for ele in index if start <= ele <= stop)
+
+    def get_search_order(self):
+        """Returns sorted list of reversed keys (tab, col, row)
+
+        This is the order, in which the grid is searched. The list is
+        cached until a cell is added or removed. It must not be altered.
+
+        """
+
+        if self._search_order is None:
+            self._search_order = sorted(key[::-1] for key in self.keys())
+
+        return self._search_order
+
+    def get_trigram_index(self):
+        """Returns trigram index of cell code, which is built on first call
+
+        Once built, the index is updated on each change of cell code.
+
+        """
+
+        if self.trigram_index is None:
+            trigram_index = TrigramIndex()
+            trigram_index.update(self.items())
+            self.trigram_index = trigram_index
+
+        return self.trigram_index
+
 # End of class DictGrid
 
 # -----------------------------------------------------------------------------
@@ -507,6 +744,87 @@ class DataArray(object):
 
         return self.dict_grid.keys()
 
+    def iter_populated(self, bbox, tab):
+        """Generator of populated keys inside bbox in row major order
+
+        The populated cell index of the grid is used, so that the work is
+        proportional to the number of populated cells and not to the size
+        of the bounding box.
+
+        Parameters
+        ----------
+
+        bbox: 2-tuple of 2-tuples of Integer
+        \t((top, left), (bottom, right)) of the area, bounds inclusive
+        tab: Integer
+        \tTable of the area
+
+        """
+
+        return self.dict_grid.populated_keys(bbox, tab)
+
+    def iter_selection(self, selection, table):
+        """Generator of populated keys inside selection in row major order
+
+        Only populated cells are visited, so that the work is proportional
+        to the number of populated cells and not to the selection size.
+        Each key is yielded once.
+
+        Parameters
+        ----------
+
+        selection: Selection
+        \tSelection, in which the keys are located
+        table: Integer
+        \tTable of the keys
+
+        """
+
+        if not selection:
+            return
+
+        if selection.rows or selection.cols:
+            # Rows and columns span the whole grid
+            bbox = ((0, 0), (self.shape[0] - 1, self.shape[1] - 1))
+        else:
+            bbox = selection.get_bbox()
+
+        keys = list(self.iter_populated(bbox, table))
+
+        for key, selected in izip(keys, selection.contains_many(keys)):
+            if selected:
+                yield key
+
+    def iter_access_keys(self, selection, table):
+        """Generator of populated keys of selection for cell code access
+
+        This generator is used in code from Selection.get_access_string.
+        The selection is traversed part by part in the order blocks, rows,
+        columns and single cells. Within each part, keys are yielded in
+        row major order. Keys that are in multiple parts are yielded once
+        for each part. Only populated cells are visited.
+
+        Parameters
+        ----------
+
+        selection: Selection
+        \tSelection, in which the keys are located
+        table: Integer
+        \tTable of the keys
+
+        """
+
+        rows, columns = self.shape[:2]
+
+        bboxes = zip(selection.block_tl, selection.block_br)
+        bboxes += [((row, 0), (row, columns - 1)) for row in selection.rows]
+        bboxes += [((0, col), (rows - 1, col)) for col in selection.cols]
+        bboxes += [(tuple(cell), tuple(cell)) for cell in selection.cells]
+
+        for bbox in bboxes:
+            for key in self.iter_populated(bbox, table):
+                yield key
+
     def pop(self, key, mark_unredo=True):
         """Pops dict_grid with undo and redo support
 
@@ -546,6 +864,23 @@ class DataArray(object):
 
         return self.dict_grid.shape
 
+    def _get_keys_beyond_shape(self, shape):
+        """Generator of populated keys that are outside of shape"""
+
+        old_rows, old_cols, old_tabs = self.shape
+        rows, cols, tabs = shape
+
+        for tab in xrange(old_tabs):
+            if tab >= tabs:
+                bboxes = [((0, 0), (old_rows - 1, old_cols - 1))]
+            else:
+                bboxes = [((rows, 0), (old_rows - 1, old_cols - 1)),
+                          ((0, cols), (rows - 1, old_cols - 1))]
+
+            for bbox in bboxes:
+                for key in self.iter_populated(bbox, tab):
+                    yield key
+
     def _set_shape(self, shape, mark_unredo=True):
         """Deletes all cells beyond new shape and sets dict_grid shape
 
@@ -564,10 +899,9 @@ class DataArray(object):
 
         if any(new_axis < old_axis
                for new_axis, old_axis in zip(shape, old_shape)):
-            for key in self.dict_grid.keys():
-                if any(key_ele >= new_axis
-                       for key_ele, new_axis in zip(key, shape)):
-                    self.pop(key)
+            self.set_cells(((key, None) for key in
+                            self._get_keys_beyond_shape(shape)),
+                           mark_unredo=False)
 
         # Set dict_grid shape attribute
 
@@ -575,8 +909,8 @@ class DataArray(object):
 
         # UnRedo support
 
-        undo_operation = (self._set_shape, [old_shape, mark_unredo])
-        redo_operation = (self._set_shape, [shape, mark_unredo])
+        undo_operation = (self._set_shape, [old_shape, False])
+        redo_operation = (self._set_shape, [shape, False])
 
         self.unredo.append(undo_operation, redo_operation)
 
@@ -711,6 +1045,72 @@ class DataArray(object):
         if mark_unredo and unredo_mark:
             self.unredo.mark()
 
+    def set_cells(self, key_values, mark_unredo=True):
+        """Sets code of multiple cells in one operation
+
+        In contrast to __setitem__, all cells are written with one dict
+        update and only one undo record is stored for the whole block.
+        Raises IndexError if a key is outside the grid shape. Then no
+        cell is changed.
+
+        Parameters
+        ----------
+        key_values: Iterable of (3-tuple of Integer, Object) tuples
+        \tCell keys and code for the cells. Empty code deletes the cell.
+        mark_unredo: Boolean, defaults to True
+        \tIf True then an unredo marker is set after the operation
+
+        Returns the number of cells that have actually been changed.
+
+        """
+
+        dict_grid = self.dict_grid
+
+        new_values = {}
+        old_values = {}
+
+        for key, value in key_values:
+            if not value:
+                value = None
+
+            # Raises IndexError for keys outside the grid shape
+            old_value = dict_grid[key]
+
+            try:
+                old_value = unicode(old_value, encoding="utf-8")
+            except TypeError:
+                pass
+
+            if old_value != value or key in new_values:
+                new_values[key] = value
+                old_values.setdefault(key, old_value)
+
+        if not new_values:
+            return 0
+
+        set_values = {}
+        for key, value in new_values.iteritems():
+            if value is None:
+                dict_grid.pop(key, None)
+            else:
+                set_values[key] = value
+
+        dict_grid.update(set_values)
+
+        # UnRedo support
+
+        undo_operation = (self.set_cells, [old_values.items(), False])
+        redo_operation = (self.set_cells, [new_values.items(), False])
+
+        self.unredo.append(undo_operation, redo_operation)
+
+        if mark_unredo:
+            self.unredo.mark()
+
+        # End UnRedo support
+
+        return len(new_values)
+
     def cell_array_generator(self, key):
         """Generator traversing cells specified in key
 
@@ -759,6 +1159,7 @@ class DataArray(object):
         # Empty cell_attributes first
         self.cell_attributes[:] = []
         self.cell_attributes.extend(value)
+        self.cell_attributes.clear_caches()
 
     def _adjust_cell_attributes(self, insertion_point, no_to_insert, axis):
         """Adjusts cell attributes on insertion/deletion"""
@@ -770,7 +1171,7 @@ class DataArray(object):
             for selection, _, _ in self.cell_attributes:
                 selection.insert(insertion_point, no_to_insert, axis)
 
-            self.cell_attributes._attr_cache.clear()
+            self.cell_attributes.clear_caches()
 
             # Adjust row heights and col widths
             cell_sizes = self.col_widths if axis else self.row_heights
@@ -797,7 +1198,7 @@ class DataArray(object):
             for i, new_tab in new_tabs:
                 self.cell_attributes[i][1] = new_tab
 
-            self.cell_attributes._attr_cache.clear()
+            self.cell_attributes.clear_caches()
 
         else:
             raise ValueError("Axis must be in [0, 1, 2]")
@@ -964,37 +1365,62 @@ class CodeArray(DataArray):
         "<", ">", "<=", ">=", "==", "!=", "<>",
     )
 
-    # Cache for results from __getitem__ calls
-    result_cache = {}
-
     # Cache for frozen objects
     frozen_cache = {}
 
+    # Persistent cache for results of cells that take long to evaluate
+    persistent_cache = None
+
+    def __init__(self, shape):
+        DataArray.__init__(self, shape)
+
+        # Cache for results from __getitem__ calls
+        self.result_cache = LRUCache(config["max_result_cache_bytes"],
+                                     get_size=get_object_size)
+
+        # Stack of dependency lists of the cells that are being evaluated
+        self.dependency_stack = []
+
     def __setitem__(self, key, value, mark_unredo=True):
         """Sets cell code and resets result cache"""
 
         # Prevent unchanged cells from being recalculated on cursor movement
 
-        repr_key = repr(key)
+        cache_key = self._get_cache_key(key)
 
-        unchanged = (repr_key in self.result_cache and
+        unchanged = (cache_key in self.result_cache and
                      value == self(key)) or \
                     ((value is None or value == "") and
-                     repr_key not in self.result_cache)
+                     cache_key not in self.result_cache)
 
         DataArray.__setitem__(self, key, value, mark_unredo=mark_unredo)
 
         if not unchanged:
             # Reset result cache
-            self.result_cache = {}
+            self.result_cache.clear()
+
+    def set_cells(self, key_values, mark_unredo=True):
+        """Sets code of multiple cells and resets result cache once"""
+
+        no_changed_cells = DataArray.set_cells(self, key_values,
+                                               mark_unredo=mark_unredo)
+
+        if no_changed_cells:
+            # Reset result cache
+            self.result_cache.clear()
+
+        return no_changed_cells
 
     def __getitem__(self, key):
         """Returns _eval_cell"""
 
+        # Record key as dependency of the cell that is being evaluated
+        if self.dependency_stack:
+            self.dependency_stack[-1].append(key)
+
         # Frozen cell handling
         if all(type(k) is not SliceType for k in key):
-            frozen_res = self.cell_attributes[key]["frozen"]
-            if frozen_res:
+            if self.is_frozen(key):
                 if repr(key) in self.frozen_cache:
                     return self.frozen_cache[repr(key)]
                 else:
@@ -1006,15 +1432,142 @@ class CodeArray(DataArray):
 
         # Normal cell handling
 
-        if repr(key) in self.result_cache:
-            return self.result_cache[repr(key)]
+        cache_key = self._get_cache_key(key)
+
+        try:
+            return self.result_cache[cache_key]
+
+        except KeyError:
+            pass
+
+        code = self(key)
 
-        elif self(key) is not None:
-            result = self._eval_cell(key, self(key))
-            self.result_cache[repr(key)] = result
+        if code is not None:
+            result = self._eval_cell_persistent(key, code)
+            self.result_cache[cache_key] = result
 
             return result
 
+    def _get_cache_key(self, key):
+        """Returns hashable result cache key for key
+
+        Slices are not hashable. They are replaced by
+        (start, stop, step) tuples.
+
+        Parameters
+        ----------
+
+        key: 3-tuple of Integer or Slice
+        \tCell key
+
+        """
+
+        key = tuple(key)
+
+        try:
+            hash(key)
+
+        except TypeError:
+            return tuple((ele.start, ele.stop, ele.step)
+                         if type(ele) is SliceType else ele for ele in key)
+
+        return key
+
+    def is_frozen(self, key):
+        """Returns True if the cell at key is frozen
+
+        Parameters
+        ----------
+
+        key: 3-tuple of Integer
+        \tKey of single cell
+
+        """
+
+        frozen_keys = self.cell_attributes.get_frozen_keys()
+
+        if frozen_keys is None:
+            return bool(self.cell_attributes[key]["frozen"])
+
+        return tuple(key) in frozen_keys
+
+    def refresh_frozen_cells(self, keys=None):
+        """Evaluates frozen cells and stores their results in frozen_cache
+
+        Cells are evaluated in row major order per table.
+        Returns the number of refreshed cells.
+
+        Parameters
+        ----------
+
+        keys: Iterable of 3-tuples of Integer, defaults to None
+        \tKeys of the frozen cells to be refreshed, all if None
+
+        """
+
+        if keys is None:
+            keys = self._get_frozen_cell_keys()
+
+        no_keys = 0
+
+        for key in sorted(keys, key=lambda key: (key[2], key[0], key[1])):
+            self.frozen_cache[repr(key)] = self._eval_cell(key, self(key))
+            no_keys += 1
+
+        return no_keys
+
+    def _get_frozen_cell_keys(self):
+        """Returns iterable of keys of all frozen cells that contain code"""
+
+        frozen_keys = self.cell_attributes.get_frozen_keys()
+
+        if frozen_keys is None:
+            return ifilter(self.is_frozen, self.keys())
+
+        return ifilter(self.dict_grid.__contains__, frozen_keys)
+
+    def get_frozen_results(self):
+        """Returns list of (key, code, result) tuples of cached frozen cells
+
+        Only frozen cells that have a result in frozen_cache are included.
+
+        """
+
+        frozen_results = []
+
+        for key in self._get_frozen_cell_keys():
+            repr_key = repr(key)
+            if repr_key in self.frozen_cache:
+                frozen_results.append((key, self(key),
+                                       self.frozen_cache[repr_key]))
+
+        return frozen_results
+
+    def set_frozen_results(self, frozen_results):
+        """Restores frozen results without evaluating cells
+
+        Results are only restored for cells that are frozen and that
+        still contain the code that the result has been computed from.
+        Returns the number of restored results.
+
+        Parameters
+        ----------
+
+        frozen_results: Iterable of (key, code, result) tuples
+        \tFrozen results, e. g. from get_frozen_results
+
+        """
+
+        no_results = 0
+
+        for key, code, result in frozen_results:
+            key = tuple(key)
+            if self.is_frozen(key) and self(key) == code:
+                self.frozen_cache[repr(key)] = result
+                no_results += 1
+
+        return no_results
+
     def _make_nested_list(self, gen):
         """Makes nested list from generator for creating numpy.array"""
 
@@ -1100,6 +1653,17 @@ class CodeArray(DataArray):
 
             return numpy.array(self._make_nested_list(code), dtype="O")
 
+        # Pasted bitmaps are taken from the decoded bitmap cache
+        try:
+            bitmap = get_bitmap_from_code(code)
+
+        except Exception:
+            # Invalid bitmap data, the error is reported by eval
+            bitmap = None
+
+        if bitmap is not None:
+            return bitmap
+
         # If only 1 term in front of the "=" --> global
 
         try:
@@ -1151,6 +1715,117 @@ class CodeArray(DataArray):
 
         return result
 
+    def _get_persistent_cache(self):
+        """Returns persistent result cache, None if it is disabled"""
+
+        if not config["persistent_cache"]:
+            return
+
+        path = config["persistent_cache_path"]
+        max_size = config["persistent_cache_size"]
+
+        persistent_cache = self.persistent_cache
+
+        if persistent_cache is None or persistent_cache.path != path or \
+           persistent_cache.max_size != max_size:
+            persistent_cache = DiskCache(path, max_size)
+            CodeArray.persistent_cache = persistent_cache
+
+        return persistent_cache
+
+    def _get_result_digest(self, cell_digest, dependencies):
+        """Returns digest of cell_digest and of the dependency results
+
+        Returns None if a dependency result cannot be pickled.
+
+        """
+
+        try:
+            return get_digest(cell_digest,
+                              [self[dependency] for dependency in dependencies])
+
+        except Exception:
+            return
+
+    def _eval_cell_persistent(self, key, code):
+        """Evaluates cell using the persistent result cache if enabled
+
+        Results are looked up by a digest of the cell key, the cell code,
+        the macros and the results of the cells that have been accessed
+        during the last evaluation. Results of cells that take longer
+        than persistent_cache_min_time seconds are stored.
+
+        Global variables that are assigned in cells are not tracked as
+        dependencies. Therefore, the cache is opt-in and should only be
+        used for deterministic cells.
+
+        Parameters
+        ----------
+
+        key: 3-tuple of Integer
+        \tKey of single cell
+        code: String
+        \tCell code
+
+        """
+
+        persistent_cache = self._get_persistent_cache()
+
+        if persistent_cache is None or self.safe_mode or \
+           not is_string_like(code):
+            return self._eval_cell(key, code)
+
+        # Cells that assign globals have to be evaluated for side effects
+        try:
+            if self._get_assignment_target_end(ast.parse(code)) != -1:
+                return self._eval_cell(key, code)
+
+        except Exception:
+            return self._eval_cell(key, code)
+
+        cell_digest = get_digest(tuple(key), code, self.macros)
+
+        # Dependencies are stored for the cell digest
+        dependencies = persistent_cache.get(cell_digest)
+
+        if dependencies is not None:
+            result_digest = self._get_result_digest(cell_digest, dependencies)
+
+            if result_digest is not None:
+                try:
+                    return persistent_cache[result_digest]
+
+                except KeyError:
+                    pass
+
+        self.dependency_stack.append([])
+        start_time = time.time()
+
+        try:
+            result = self._eval_cell(key, code)
+
+        finally:
+            dependencies = self.dependency_stack.pop()
+
+        eval_time = time.time() - start_time
+
+        if eval_time < config["persistent_cache_min_time"] or \
+           isinstance(result, Exception):
+            return result
+
+        result_digest = self._get_result_digest(cell_digest, dependencies)
+
+        if result_digest is not None:
+            try:
+                persistent_cache[cell_digest] = dependencies
+                persistent_cache[result_digest] = result
+
+            except Exception:
+                # Result cannot be pickled or cache directory not writable
+                pass
+
+        return result
+
     def reload_modules(self):
         """Reloads modules that are available in cells"""
 
@@ -1163,17 +1838,8 @@ class CodeArray(DataArray):
     def clear_globals(self):
         """Clears all newly assigned globals"""
 
-        base_keys = ['cStringIO', 'IntType', 'KeyValueStore', 'UnRedo',
-                     'is_generator_like', 'StringGeneratorMixin',
-                     'is_string_like', 'ParserMixin', 'bz2', 'base64',
-                     '__package__', 're', 'config', '__doc__', 'SliceType',
-                     'CellAttributes', 'product', 'ast', '__builtins__',
-                     '__file__', 'charts', 'sys', 'is_slice_like', '__name__',
-                     'copy', 'imap', 'wx', 'ifilter', 'Selection', 'DictGrid',
-                     'numpy', 'CodeArray', 'DataArray', 'datetime']
-
         for key in globals().keys():
-            if key not in base_keys:
+            if key not in _base_keys:
                 globals().pop(key)
 
     def execute_macros(self):
@@ -1252,6 +1918,63 @@ class CodeArray(DataArray):
         for key in searchkeys:
             yield key
 
+    def get_search_regex(self, findstring, flags):
+        """Returns compiled regular expression for findstring
+
+        The expression is shared by find and replace operations so that
+        both match the same occurrences.
+
+        Parameters
+        ----------
+
+        findstring: String
+        \tString to be searched for
+        flags: List of strings
+        \tSearch flags, see _string_match
+
+        """
+
+        if "REG_EXP" in flags:
+            return re.compile(findstring)
+
+        pattern = re.escape(findstring)
+
+        if "WHOLE_WORD" in flags:
+            pattern = r'\b' + pattern + r'\b'
+
+        if "MATCH_CASE" in flags:
+            return re.compile(pattern)
+
+        else:
+            return re.compile(pattern, re.IGNORECASE)
+
+    def _get_string_matcher(self, findstring, flags):
+        """Returns function that returns position of findstring in a string
+
+        The function returns None if findstring is not found.
+        The search pattern is compiled only once.
+
+        Parameters
+        ----------
+
+        findstring: String
+        \tString to be searched for
+        flags: List of strings
+        \tSearch flags, see _string_match
+
+        """
+
+        search = self.get_search_regex(findstring, flags).search
+
+        def string_match(datastring):
+            """Returns position of findstring in datastring or None"""
+
+            match = search(datastring)
+            if match is not None:
+                return match.start()
+
+        return string_match
+
     def _string_match(self, datastring, findstring, flags=None):
         """
         Returns position of findstring in datastring or None if not found.
@@ -1269,30 +1992,125 @@ class CodeArray(DataArray):
         if flags is None:
             flags = []
 
+        return self._get_string_matcher(findstring, flags)(datastring)
+
+    def _get_search_indices(self, search_order, startkey, reverse):
+        """Returns iterator of search_order indices starting at startkey
+
+        The iterator wraps around at the end of search_order.
+
+        """
+
+        no_keys = len(search_order)
+        startkey = tuple(startkey[::-1])
+
+        if reverse:
+            pos = bisect_right(search_order, startkey)
+            return chain(xrange(pos - 1, -1, -1),
+                         xrange(no_keys - 1, pos - 1, -1))
+
+        else:
+            pos = bisect_left(search_order, startkey)
+            return chain(xrange(pos, no_keys), xrange(pos))
+
+    def _get_cached_keys(self):
+        """Returns set of keys of single cells that have cached results"""
+
+        cached_keys = set()
+
+        for key in self.result_cache.keys():
+            # Keys of slices contain tuples
+            if all(type(ele) is not tuple for ele in key):
+                cached_keys.add(key)
+
+        return cached_keys
+
+    def iter_matches(self, startkey, find_string, flags, evaluate=False,
+                     cancel=None):
+        """Returns iterator of keys of matching cells in search order
+
+        The search starts at startkey and wraps around the grid once.
+        For each cell, the code string is matched first and the result
+        string second. Results are only matched if they are in the
+        result cache or if evaluate is True.
+
+        The trigram index and the search order are built when
+        iter_matches is called. Without evaluation, the returned iterator
+        only reads code and cached results so that it may be consumed in
+        a worker thread.
+
+        Searches for plain strings use the trigram index of the grid.
+        Then only index candidates and cells with cached results are
+        visited if evaluate is False. Regular expressions and strings
+        that are shorter than 3 characters require a scan of all cells.
+
+        Parameters
+        ----------
+
+        startkey: 3-tuple of Integer
+        \tStart position of search
+        find_string: String
+        \tString to be searched for
+        flags: List of strings, out of
+        \t["UP" xor "DOWN", "WHOLE_WORD", "MATCH_CASE", "REG_EXP"]
+        evaluate: Bool, defaults to False
+        \tCells without cached results are evaluated if True
+        cancel: Function, defaults to None
+        \tCalled once per cell, the search is stopped if it returns True
+
+        """
+
+        string_match = self._get_string_matcher(find_string, flags)
+
         if "REG_EXP" in flags:
-            match = re.search(findstring, datastring)
-            if match is None:
-                pos = -1
-            else:
-                pos = match.start()
+            candidates = None
         else:
-            if "MATCH_CASE" not in flags:
-                datastring = datastring.lower()
-                findstring = findstring.lower()
-
-            if "WHOLE_WORD" in flags:
-                pos = -1
-                matchstring = r'\b' + findstring + r'+\b'
-                for match in re.finditer(matchstring, datastring):
-                    pos = match.start()
-                    break  # find 1st occurrance
-            else:
-                pos = datastring.find(findstring)
+            trigram_index = self.dict_grid.get_trigram_index()
+            candidates = trigram_index.candidates(find_string)
 
-        if pos == -1:
-            return None
+        if candidates is None or evaluate:
+            search_order = self.dict_grid.get_search_order()
         else:
-            return pos
+            keys = candidates | self._get_cached_keys()
+            search_order = sorted(key[::-1] for key in keys)
+
+        indices = self._get_search_indices(search_order, startkey,
+                                           "UP" in flags)
+
+        return self._iter_matches(search_order, indices, candidates,
+                                  string_match, evaluate, cancel)
+
+    def _iter_matches(self, search_order, indices, candidates, string_match,
+                      evaluate, cancel):
+        """Generator of keys of matching cells, see iter_matches"""
+
+        for index in indices:
+            if cancel is not None and cancel():
+                return
+
+            key = search_order[index][::-1]
+
+            # The cell may have been removed after the search has started
+            code = self.dict_grid.get(key)
+            if code is None:
+                continue
+
+            if (candidates is None or key in candidates) and \
+               string_match(code) is not None:
+                yield key
+                continue
+
+            try:
+                result = self.result_cache[key]
+
+            except KeyError:
+                if not evaluate:
+                    continue
+
+                result = self[key]
+
+            if string_match(unicode(result)) is not None:
+                yield key
 
     def findnextmatch(self, startkey, find_string, flags):
         """ Returns a tuple with the position of the next match of find_string
@@ -1311,16 +2129,16 @@ class CodeArray(DataArray):
         assert "UP" in flags or "DOWN" in flags
         assert not ("UP" in flags and "DOWN" in flags)
 
-        # List of keys in sgrid in search order
+        # Code and cached results are searched before cells are evaluated
 
-        reverse = "UP" in flags
-
-        for key in self._sorted_keys(self.keys(), startkey, reverse=reverse):
-            code = self(key)
-            res_str = unicode(self[key])
-
-            if self._string_match(code, find_string, flags) is not None or \
-               self._string_match(res_str, find_string, flags) is not None:
+        for evaluate in False, True:
+            for key in self.iter_matches(startkey, find_string, flags,
+                                         evaluate=evaluate):
                 return key
 
 # End of class CodeArray
+
+# -----------------------------------------------------------------------------
+
+# Module level names at import time, which are kept by clear_globals
+_base_keys = frozenset(globals().keys() + ["_base_keys"])
@@ -32,7 +32,10 @@ import ast
 import fractions  ## Yes, it is required
 import math  ## Yes, it is required
 import os
+import pickle
+import shutil
 import sys
+import tempfile
 
 import py.test as pytest
 import numpy
@@ -47,6 +50,8 @@ sys.path.insert(0, TESTPATH + "/../..")
 
 from src.lib.testlib import params, pytest_generate_tests
 
+from src.config import config
+
 from src.model.model import KeyValueStore, CellAttributes, DictGrid
 from src.model.model import DataArray, CodeArray
 
@@ -109,6 +114,34 @@ class TestCellAttributes(object):
         assert self.cell_attr[32, 53, 0]["testattr"] == 2
         assert self.cell_attr[2, 2, 0]["testattr"] == 3
 
+    def test_get_frozen_keys(self):
+        """Test get_frozen_keys"""
+
+        assert self.cell_attr.get_frozen_keys() == set()
+
+        selection_1 = Selection([], [], [], [], [(2, 2)])
+        selection_2 = Selection([], [], [], [], [(3, 2)])
+
+        self.cell_attr.undoable_append((selection_1, 0, {"frozen": True}))
+        self.cell_attr.undoable_append((selection_2, 1, {"frozen": True}))
+        self.cell_attr.undoable_append((selection_1, 0, {"angle": 0.2}))
+
+        assert self.cell_attr.get_frozen_keys() == set([(2, 2, 0), (3, 2, 1)])
+
+        self.cell_attr.undoable_append((selection_1, 0, {"frozen": False}))
+
+        assert self.cell_attr.get_frozen_keys() == set([(3, 2, 1)])
+
+        self.cell_attr.unredo.undo()
+
+        assert self.cell_attr.get_frozen_keys() == set([(2, 2, 0), (3, 2, 1)])
+
+        # Frozen blocks require attribute look up
+        selection_3 = Selection([(0, 0)], [(1, 1)], [], [], [])
+        self.cell_attr.undoable_append((selection_3, 0, {"frozen": True}))
+
+        assert self.cell_attr.get_frozen_keys() is None
+
     def test_get_merging_cell(self):
         """Test get_merging_cell"""
 
@@ -290,6 +323,67 @@ class TestDictGrid(object):
         self.dict_grid[(2, 4, 5)] = "Test"
         assert self.dict_grid[(2, 4, 5)] == "Test"
 
+    def test_populated_keys(self):
+        """Unit test for populated_keys"""
+
+        for key in [(5, 3, 0), (2, 4, 0), (2, 1, 0), (3, 9, 0), (2, 4, 1)]:
+            self.dict_grid[key] = "Test"
+
+        bbox = ((2, 0), (5, 4))
+
+        assert list(self.dict_grid.populated_keys(bbox, 0)) == \
+            [(2, 1, 0), (2, 4, 0), (5, 3, 0)]
+
+        self.dict_grid.pop((2, 1, 0))
+        del self.dict_grid[(5, 3, 0)]
+        self.dict_grid.update({(4, 0, 0): "Test"})
+
+        assert list(self.dict_grid.populated_keys(bbox, 0)) == \
+            [(2, 4, 0), (4, 0, 0)]
+
+        self.dict_grid.clear()
+
+        assert list(self.dict_grid.populated_keys(bbox, 1)) == []
+
+    param_pickle = [
+        {'protocol': 0},
+        {'protocol': 2},
+    ]
+
+    @params(param_pickle)
+    def test_pickle(self, protocol):
+        """Unit test for pickling with populated cell index"""
+
+        self.dict_grid[(2, 4, 0)] = "Test"
+        self.dict_grid.macros = u"a = 1"
+
+        dict_grid = pickle.loads(pickle.dumps(self.dict_grid, protocol))
+
+        assert dict_grid == self.dict_grid
+        assert dict_grid.macros == u"a = 1"
+        assert list(dict_grid.populated_keys(((0, 0), (5, 5)), 0)) == \
+            [(2, 4, 0)]
+
+        dict_grid.pop((2, 4, 0))
+        assert list(dict_grid.populated_keys(((0, 0), (5, 5)), 0)) == []
+
+    def test_get_trigram_index(self):
+        """Unit test for get_trigram_index"""
+
+        self.dict_grid[(0, 0, 0)] = "'Hello'"
+        self.dict_grid[(1, 0, 0)] = "'World'"
+
+        trigram_index = self.dict_grid.get_trigram_index()
+
+        assert trigram_index.candidates("hello") == set([(0, 0, 0)])
+
+        self.dict_grid[(2, 0, 0)] = "'Hello World'"
+        self.dict_grid.pop((0, 0, 0))
+
+        assert trigram_index.candidates("hello") == set([(2, 0, 0)])
+        assert trigram_index.candidates("world") == \
+            set([(1, 0, 0), (2, 0, 0)])
+
 
 class TestDataArray(object):
     """Unit tests for DataArray"""
@@ -319,6 +413,44 @@ class TestDataArray(object):
 
         assert sorted(self.data_array.keys()) == [(1, 2, 3), (1, 2, 4)]
 
+    param_iter_selection = [
+        {'selection': Selection([], [], [], [], []), 'res': []},
+        {'selection': Selection([(1, 1)], [(2, 5)], [], [], [(9, 9)]),
+         'res': [(1, 1, 0), (2, 5, 0), (9, 9, 0)]},
+        {'selection': Selection([], [], [2], [1], []),
+         'res': [(1, 1, 0), (2, 0, 0), (2, 5, 0)]},
+        {'selection': Selection([(0, 0)], [(1, 1)], [1], [], [(1, 1)]),
+         'res': [(1, 1, 0)]},
+    ]
+
+    @params(param_iter_selection)
+    def test_iter_selection(self, selection, res):
+        """Unit test for iter_selection"""
+
+        for key in [(1, 1, 0), (2, 0, 0), (2, 5, 0), (9, 9, 0), (1, 1, 1)]:
+            self.data_array[key] = "1"
+
+        assert list(self.data_array.iter_selection(selection, 0)) == res
+
+    param_iter_access_keys = [
+        {'selection': Selection([], [], [], [], []), 'res': []},
+        {'selection': Selection([(1, 1)], [(2, 5)], [], [], [(9, 9)]),
+         'res': [(1, 1, 0), (2, 5, 0), (9, 9, 0)]},
+        {'selection': Selection([], [], [2], [1], []),
+         'res': [(2, 0, 0), (2, 5, 0), (1, 1, 0)]},
+        {'selection': Selection([(0, 0)], [(1, 1)], [1], [], [(1, 1)]),
+         'res': [(1, 1, 0), (1, 1, 0), (1, 1, 0)]},
+    ]
+
+    @params(param_iter_access_keys)
+    def test_iter_access_keys(self, selection, res):
+        """Unit test for iter_access_keys"""
+
+        for key in [(1, 1, 0), (2, 0, 0), (2, 5, 0), (9, 9, 0), (1, 1, 1)]:
+            self.data_array[key] = "1"
+
+        assert list(self.data_array.iter_access_keys(selection, 0)) == res
+
     def test_pop(self):
         """Unit test for pop"""
 
@@ -338,6 +470,37 @@ class TestDataArray(object):
 
         assert self.data_array.shape == (10000, 100, 100)
 
+        for key in [(0, 0, 0), (20, 0, 0), (0, 20, 0), (0, 0, 20),
+                    (9, 9, 9)]:
+            self.data_array[key] = "1"
+
+        self.data_array.shape = (10, 10, 10)
+
+        assert sorted(self.data_array.keys()) == [(0, 0, 0), (9, 9, 9)]
+
+        self.data_array.unredo.undo()
+
+        assert self.data_array.shape == (10000, 100, 100)
+        assert len(self.data_array.keys()) == 5
+
+    param_iter_populated = [
+        {'bbox': ((0, 0), (99, 99)), 'tab': 0,
+         'res': [(1, 2, 0), (1, 50, 0), (3, 1, 0)]},
+        {'bbox': ((1, 2), (1, 2)), 'tab': 0, 'res': [(1, 2, 0)]},
+        {'bbox': ((2, 0), (99, 99)), 'tab': 0, 'res': [(3, 1, 0)]},
+        {'bbox': ((0, 0), (99, 99)), 'tab': 1, 'res': [(1, 2, 1)]},
+        {'bbox': ((0, 0), (0, 99)), 'tab': 0, 'res': []},
+    ]
+
+    @params(param_iter_populated)
+    def test_iter_populated(self, bbox, tab, res):
+        """Unit test for iter_populated"""
+
+        for key in [(3, 1, 0), (1, 50, 0), (1, 2, 0), (1, 2, 1)]:
+            self.data_array[key] = "1"
+
+        assert list(self.data_array.iter_populated(bbox, tab)) == res
+
     def test_getstate(self):
         """Unit test for __getstate__ (pickle support)"""
 
@@ -359,6 +522,53 @@ class TestDataArray(object):
 
         assert self.data_array[0, 0, 0] == "'Tes'"
 
+    def test_set_cells(self):
+        """Unit test for set_cells"""
+
+        self.data_array[0, 0, 0] = "'Test'"
+
+        key_values = [((0, 0, 0), None), ((1, 0, 0), "1"), ((2, 3, 4), "2")]
+        self.data_array.set_cells(key_values)
+
+        assert self.data_array[0, 0, 0] is None
+        assert self.data_array[1, 0, 0] == "1"
+        assert self.data_array[2, 3, 4] == "2"
+
+        # All cells are changed in one undo step
+        self.data_array.unredo.undo()
+
+        assert self.data_array[0, 0, 0] == "'Test'"
+        assert self.data_array[1, 0, 0] is None
+        assert self.data_array[2, 3, 4] is None
+
+        self.data_array.unredo.redo()
+
+        assert self.data_array[0, 0, 0] is None
+        assert self.data_array[2, 3, 4] == "2"
+
+    def test_set_cells_shape(self):
+        """Keys outside the grid shape are rejected by set_cells"""
+
+        key_values = [((1, 0, 0), "1"), ((100, 0, 0), "2")]
+
+        with pytest.raises(IndexError):
+            self.data_array.set_cells(key_values)
+
+        # No cell has been changed
+        assert self.data_array[1, 0, 0] is None
+        assert (100, 0, 0) not in self.data_array.dict_grid
+
+    def test_set_cells_undo(self):
+        """Undo records of set_cells match those of __setitem__"""
+
+        self.data_array.dict_grid[0, 0, 0] = "'Test'"
+
+        self.data_array.set_cells([((0, 0, 0), u"1")])
+        self.data_array.unredo.undo()
+
+        assert type(self.data_array((0, 0, 0))) is unicode
+        assert self.data_array((0, 0, 0)) == u"'Test'"
+
     def test_cell_array_generator(self):
         """Unit test for cell_array_generator"""
 
@@ -466,6 +676,40 @@ class TestCodeArray(object):
 
         self.code_array = CodeArray((100, 10, 3))
 
+    param_access_string = [
+        {'selection': Selection([(1, 1)], [(3, 2)], [2], [1], [(2, 1)]),
+         'old_string': "[S[key] for key in [(r, c, 0) for r in xrange(1, 4) "
+                       "for c in xrange(1, 3)] + [(2, c, 0) for c in "
+                       "xrange(10)] + [(r, 1, 0) for r in xrange(100)] + "
+                       "[(2, 1, 0)] if S[key] is not None]"},
+        {'selection': Selection([(0, 0), (2, 1)], [(2, 1), (3, 3)], [], [],
+                                []),
+         'old_string': "[S[key] for key in [(r, c, 0) for r in xrange(0, 3) "
+                       "for c in xrange(0, 2)] + [(r, c, 0) for r in "
+                       "xrange(2, 4) for c in xrange(1, 4)] "
+                       "if S[key] is not None]"},
+    ]
+
+    @params(param_access_string)
+    def test_access_string(self, selection, old_string):
+        """Access strings give the same results as the former key lists"""
+
+        code_array = self.code_array
+
+        for row in xrange(5):
+            for col in xrange(5):
+                code_array[row, col, 0] = repr(row * 10 + col)
+
+        code_array[3, 1, 0] = "None"
+        code_array[99, 1, 0] = "99"
+
+        access_string = selection.get_access_string(code_array.shape, 0)
+
+        code_array[50, 5, 0] = access_string
+        code_array[51, 5, 0] = old_string
+
+        assert code_array[50, 5, 0] == code_array[51, 5, 0]
+
     def test_slicing(self):
         """Unit test for __getitem__ and __setitem__"""
 
@@ -644,3 +888,119 @@ class TestCodeArray(object):
         assert code_array[3, 0, 0] == 3
         assert code_array.findnextmatch((0, 0, 0), "3", "DOWN") == (3, 0, 0)
         assert code_array.findnextmatch((0, 0, 0), "99", "DOWN") == (99, 0, 0)
+
+    def test_iter_matches(self):
+        """Unit test for iter_matches"""
+
+        code_array = self.code_array
+
+        code_array[0, 0, 0] = "'Test'"
+        code_array[5, 0, 0] = "'Te' + 'st'"
+        code_array[0, 1, 0] = "'Test'"
+
+        matches = code_array.iter_matches((1, 0, 0), "test", ["DOWN"])
+
+        # The result of cell (5, 0, 0) is not cached yet
+        assert list(matches) == [(0, 1, 0), (0, 0, 0)]
+
+        matches = code_array.iter_matches((1, 0, 0), "test", ["DOWN"],
+                                          evaluate=True)
+        assert list(matches) == [(5, 0, 0), (0, 1, 0), (0, 0, 0)]
+
+        matches = code_array.iter_matches((1, 0, 0), "test", ["UP"])
+        assert list(matches) == [(0, 0, 0), (0, 1, 0), (5, 0, 0)]
+
+        matches = code_array.iter_matches((1, 0, 0), "test", ["DOWN"],
+                                          cancel=lambda: True)
+        assert list(matches) == []
+
+        # The index is built by the caller, not by the consuming thread
+        code_array.dict_grid.trigram_index = None
+        matches = code_array.iter_matches((1, 0, 0), "test", ["DOWN"])
+        assert code_array.dict_grid.trigram_index is not None
+
+        # Later changes are kept in the index
+        code_array[7, 0, 0] = "'Test'"
+        assert (7, 0, 0) in \
+            code_array.dict_grid.trigram_index.candidates("test")
+
+    def test_clear_globals(self):
+        """Unit test for clear_globals"""
+
+        self.code_array.clear_globals()
+
+        # Module level names of model.py must not be cleared
+        code_array = CodeArray((10, 10, 1))
+        code_array[0, 0, 0] = "1"
+
+        assert code_array[0, 0, 0] == 1
+
+    def test_result_cache(self):
+        """Unit test for result cache"""
+
+        code_array = self.code_array
+
+        code_array[0, 0, 0] = "1"
+        code_array[1, 0, 0] = "2"
+
+        assert code_array[0, 0, 0] == 1
+        assert list(code_array[:2, 0, 0]) == [1, 2]
+
+        assert (0, 0, 0) in code_array.result_cache
+        assert ((None, 2, None), 0, 0) in code_array.result_cache
+
+        hits = code_array.result_cache.hits
+        code_array[0, 0, 0]
+        assert code_array.result_cache.hits == hits + 1
+
+        # Result caches are owned by instances
+        assert CodeArray((10, 10, 1)).result_cache is not \
+            code_array.result_cache
+
+        # Changing code resets the result cache
+        code_array[0, 0, 0] = "3"
+        assert len(code_array.result_cache) == 0
+        assert code_array[0, 0, 0] == 3
+
+    def test_persistent_cache(self):
+        """Unit test for _eval_cell_persistent"""
+
+        code_array = self.code_array
+
+        config_keys = ["persistent_cache", "persistent_cache_path",
+                       "persistent_cache_min_time"]
+        old_config = [getattr(config.data, key) for key in config_keys]
+
+        path = tempfile.mkdtemp()
+
+        config["persistent_cache"] = "True"
+        config["persistent_cache_path"] = repr(path)
+        config["persistent_cache_min_time"] = "0"
+
+        try:
+            code_array[1, 0, 0] = "1"
+            code_array[0, 0, 0] = "S[1, 0, 0] + numpy.random.random()"
+
+            res = code_array[0, 0, 0]
+
+            # Result is reused instead of being evaluated again
+            code_array.result_cache.clear()
+            assert code_array[0, 0, 0] == res
+
+            # Result is evaluated again if a dependency changes
+            code_array[1, 0, 0] = "2"
+            assert code_array[0, 0, 0] != res
+
+            code_array[1, 0, 0] = "1"
+            assert code_array[0, 0, 0] == res
+
+            # Result is evaluated again if macros change
+            code_array.macros = u"a = 1"
+            code_array.result_cache.clear()
+            assert code_array[0, 0, 0] != res
+
+        finally:
+            for key, value in zip(config_keys, old_config):
+                config[key] = value
+
+            shutil.rmtree(path)